@@ -0,0 +1 @@
+"""Benchmarks for the Decision Bot hot paths."""
@@ -0,0 +1,398 @@
+"""Deterministic micro-benchmarks for the bot's hot paths.
+
+Benchmarked paths:
+- ``OptionParser.parse_options``
+- ``LLMClient._build_prompt``
+- ``DecisionHandler.handle_decision_request`` (mocked Message and LLM)
+- ``webhook_handler`` update deserialization (mocked Bot and Dispatcher)
+
+Every path is timed with ``time.perf_counter`` (best of several repeats) and
+then run once more under ``tracemalloc`` to measure the peak number of bytes
+allocated per call. Times are also reported relative to a fixed pure-Python
+calibration workload, so a baseline recorded on one machine remains usable
+on another.
+
+Usage:
+    python -m benchmarks.bench_hotpaths
+    python -m benchmarks.bench_hotpaths --threshold 0.15
+    python -m benchmarks.bench_hotpaths --update-baseline
+
+The command exits with status 1 when any path regresses by more than the
+threshold against the stored baseline. ``--update-baseline`` refuses to
+record such a regression unless ``--accept-regressions`` is also given, so
+accepting one is a deliberate, separate step.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable, Sequence
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import structlog
+
+from benchmarks.corpus import MESSAGES, webhook_payloads
+from benchmarks.fakes import FakeDispatcher, FakeMessage, make_config
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = float(os.getenv("BENCH_THRESHOLD", "0.25"))
+
+# Allocation deltas below this many bytes are treated as noise.
+ALLOC_SLACK_BYTES = 256
+
+FAKE_COMPLETION = (
+    '{"choice": 1, "reason": "Лёгкий ужин и приятное разнообразие вкусов"}'
+)
+
+
+class FakeCompletions:
+    """Stand-in for ``AsyncOpenAI().chat.completions`` with a canned reply."""
+
+    def __init__(self, content: str = FAKE_COMPLETION):
+        self._response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=64),
+        )
+
+    async def create(self, **params: Any) -> Any:
+        return self._response
+
+
+class FakeRequest:
+    """Minimal stand-in for ``aiohttp.web.Request`` carrying a raw body."""
+
+    def __init__(self, app: Any, body: bytes, headers: dict[str, str] | None = None):
+        self.app = app
+        self.headers = headers or {}
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def json(self) -> Any:
+        return json.loads(self._body)
+
+
+class Benchmark:
+    """A named hot path together with the inputs it is exercised with."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        items: Sequence[Any],
+        is_async: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.items = items
+        self.is_async = is_async
+
+
+def silence_logging() -> None:
+    """Drop all log output so logging does not dominate the measurements."""
+    structlog.configure(
+        processors=[],
+        wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL),
+        logger_factory=structlog.ReturnLoggerFactory(),
+        cache_logger_on_first_use=False,
+    )
+
+
+def build_benchmarks(loop: asyncio.AbstractEventLoop) -> list[Benchmark]:
+    """Create the benchmark set with mocked Telegram and LLM backends."""
+    from main import create_app, webhook_handler
+    from src.handlers.decision_handler import DecisionHandler
+    from src.services.advice_cache import AdviceCache
+    from src.services.option_parser import OptionParser
+    from src.services.update_dedup import SeenUpdates
+
+    config = make_config()
+
+    parser = OptionParser(max_options=config.max_options)
+    parsed = [options for options in map(parser.parse_options, MESSAGES) if options]
+
+    handler = DecisionHandler(config)
+    handler.openai_client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=FakeCompletions())
+    )
+    # Measure the full LLM path rather than advice cache hits
+    handler.openai_client.cache = AdviceCache(maxsize=0)
+    llm_client = handler.openai_client
+
+    prompt_inputs = []
+    for i, options in enumerate(parsed):
+        context = "Сегодня вечер пятницы" if i % 3 == 0 else None
+        votes = {option: len(parsed) - j for j, option in enumerate(options)}
+        prompt_inputs.append((options, context, votes if i % 4 == 0 else None))
+
+    messages = [FakeMessage(text) for text in MESSAGES]
+
+    app = loop.run_until_complete(
+        create_app(SimpleNamespace(id=0), FakeDispatcher(), config)
+    )
+    # Replayed payloads must not be short-circuited as duplicates
+    app["seen_updates"] = SeenUpdates(ttl=0)
+    requests = [
+        FakeRequest(app, json.dumps(payload, ensure_ascii=False).encode())
+        for payload in webhook_payloads()
+    ]
+
+    return [
+        Benchmark("option_parser.parse_options", parser.parse_options, MESSAGES),
+        Benchmark(
+            "llm_client._build_prompt",
+            lambda args: llm_client._build_prompt(*args),
+            prompt_inputs,
+        ),
+        Benchmark(
+            "decision_handler.handle_decision_request",
+            handler.handle_decision_request,
+            messages,
+            is_async=True,
+        ),
+        Benchmark("main.webhook_handler", webhook_handler, requests, is_async=True),
+    ]
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Time a fixed pure-Python workload used to normalize results."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        total = 0
+        for i in range(200_000):
+            total += i * i % 7
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def _run_async(
+    func: Callable[[Any], Awaitable[Any]], items: Sequence[Any], iterations: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for item in items:
+            await func(item)
+    return time.perf_counter() - start
+
+
+def _run_sync(
+    func: Callable[[Any], Any], items: Sequence[Any], iterations: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for item in items:
+            func(item)
+    return time.perf_counter() - start
+
+
+async def _alloc_async(
+    func: Callable[[Any], Awaitable[Any]], items: Sequence[Any]
+) -> int:
+    total_peak = 0
+    for item in items:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await func(item)
+        total_peak += tracemalloc.get_traced_memory()[1] - before
+    return total_peak
+
+
+def _alloc_sync(func: Callable[[Any], Any], items: Sequence[Any]) -> int:
+    total_peak = 0
+    for item in items:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func(item)
+        total_peak += tracemalloc.get_traced_memory()[1] - before
+    return total_peak
+
+
+def measure(
+    bench: Benchmark,
+    loop: asyncio.AbstractEventLoop,
+    iterations: int,
+    repeat: int,
+) -> dict[str, float]:
+    """Measure per-call time and peak allocations for one benchmark."""
+    calls = iterations * len(bench.items)
+
+    # Warm up caches (regex compilation, lazy imports, pydantic validators)
+    if bench.is_async:
+        loop.run_until_complete(_run_async(bench.func, bench.items, 1))
+    else:
+        _run_sync(bench.func, bench.items, 1)
+
+    best = float("inf")
+    calibration = float("inf")
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            # Interleave calibration so both see the same machine load
+            calibration = min(calibration, calibrate(repeat=1))
+            random.seed(0)
+            if bench.is_async:
+                elapsed = loop.run_until_complete(
+                    _run_async(bench.func, bench.items, iterations)
+                )
+            else:
+                elapsed = _run_sync(bench.func, bench.items, iterations)
+            best = min(best, elapsed)
+    finally:
+        gc.enable()
+
+    random.seed(0)
+    tracemalloc.start()
+    try:
+        if bench.is_async:
+            total_peak = loop.run_until_complete(_alloc_async(bench.func, bench.items))
+        else:
+            total_peak = _alloc_sync(bench.func, bench.items)
+    finally:
+        tracemalloc.stop()
+
+    per_call = best / calls
+    return {
+        "time_per_call_us": round(per_call * 1e6, 3),
+        "time_ratio": round(per_call / calibration, 6),
+        "alloc_peak_bytes": round(total_peak / len(bench.items)),
+    }
+
+
+def run_benchmarks(
+    iterations: int = 20, repeat: int = 5, only: Sequence[str] | None = None
+) -> dict[str, dict[str, float]]:
+    """Run all benchmarks and return their results keyed by name."""
+    silence_logging()
+    loop = asyncio.new_event_loop()
+    try:
+        benchmarks = build_benchmarks(loop)
+        return {
+            bench.name: measure(bench, loop, iterations, repeat)
+            for bench in benchmarks
+            if not only or bench.name in only
+        }
+    finally:
+        loop.close()
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Return human-readable regressions of ``results`` against ``baseline``."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+
+        if current["time_ratio"] > base["time_ratio"] * (1 + threshold):
+            change = current["time_ratio"] / base["time_ratio"] - 1
+            regressions.append(f"{name}: time +{change:.0%}")
+
+        alloc_limit = base["alloc_peak_bytes"] * (1 + threshold) + ALLOC_SLACK_BYTES
+        if current["alloc_peak_bytes"] > alloc_limit:
+            regressions.append(
+                f"{name}: allocations {base['alloc_peak_bytes']} -> "
+                f"{current['alloc_peak_bytes']} bytes/call"
+            )
+    return regressions
+
+
+def format_table(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]
+) -> str:
+    """Render results as a plain-text table."""
+    lines = [
+        f"{'benchmark':<42} {'us/call':>10} {'ratio':>10} {'alloc B':>10} {'vs base':>8}"
+    ]
+    for name, result in results.items():
+        base = baseline.get(name)
+        delta = (
+            f"{result['time_ratio'] / base['time_ratio'] - 1:+.0%}" if base else "new"
+        )
+        lines.append(
+            f"{name:<42} {result['time_per_call_us']:>10.2f} "
+            f"{result['time_ratio']:>10.6f} {result['alloc_peak_bytes']:>10} "
+            f"{delta:>8}"
+        )
+    return "\n".join(lines)
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, float]]:
+    """Load stored baseline results, or an empty dict if there are none."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+def save_baseline(path: Path, results: dict[str, dict[str, float]]) -> None:
+    """Store results as the new baseline."""
+    payload = {"python": sys.version.split()[0], "results": results}
+    path.write_text(
+        json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed relative regression, e.g. 0.25 for 25%%",
+    )
+    parser.add_argument("--only", action="append", help="run only this benchmark")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--accept-regressions",
+        action="store_true",
+        help="let --update-baseline record results that regress past the threshold",
+    )
+    parser.add_argument("--json-out", type=Path, help="also write results here")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.iterations, args.repeat, args.only)
+    baseline = load_baseline(args.baseline)
+
+    print(format_table(results, baseline))
+
+    if args.json_out:
+        args.json_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions over {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+
+    if args.update_baseline:
+        if regressions and not args.accept_regressions:
+            print("Baseline not updated; pass --accept-regressions to record them")
+            return 1
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
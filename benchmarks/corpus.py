@@ -0,0 +1,135 @@
+"""Message corpus used by the hot path benchmarks.
+
+The messages mirror what users actually send: short Russian and English
+questions in every format the option parser supports, plus a few messages
+that should fail to parse.
+"""
+
+from typing import Any
+
+MESSAGES: list[str] = [
+    # "или" / "or" separated
+    "Пицца или суши?",
+    "Кофе или чай?",
+    "Пойти в кино или остаться дома?",
+    "Купить iPhone или Android?",
+    "Море или горы этим летом?",
+    "Pizza or sushi?",
+    "Python or Go for the new service?",
+    "Run in the morning or in the evening?",
+    # comma separated
+    "Кино, театр или дом",
+    "Борщ, пельмени, плов, шаурма",
+    "Coffee, tea, water",
+    "Netflix, a book, or a board game?",
+    # line separated
+    "Кофе\nЧай\nКакао",
+    "Москва\nСанкт-Петербург\nКазань\nСочи",
+    "Read a book\nWatch a movie\nGo for a walk",
+    # numbered lists
+    "1. Пойти в спортзал\n2. Остаться дома",
+    "1. Утренняя пробежка\n2. Йога дома\n3. Велосипед",
+    "1) Learn Rust\n2) Learn Kotlin\n3) Learn Elixir",
+    "1. Переехать в другой город ради новой работы\n"
+    "2. Остаться и попросить повышение\n"
+    "3. Уйти во фриланс\n"
+    "4. Открыть своё дело\n"
+    "5. Взять творческий отпуск\n"
+    "6. Вернуться к учёбе",
+    # messages that should not parse
+    "Привет!",
+    "Only one option",
+    "а если вечером?",
+]
+
+_USER = {
+    "id": 424242,
+    "is_bot": False,
+    "first_name": "Иван",
+    "username": "ivan_decides",
+    "language_code": "ru",
+}
+_CHAT = {"id": 424242, "type": "private", "first_name": "Иван"}
+
+
+def text_update(update_id: int, text: str) -> dict[str, Any]:
+    """Build a raw Telegram update payload for a text message."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1_700_000_000 + update_id,
+            "chat": _CHAT,
+            "from": _USER,
+            "text": text,
+        },
+    }
+
+
+def sticker_update(update_id: int) -> dict[str, Any]:
+    """Build a raw Telegram update payload for a sticker message."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1_700_000_000 + update_id,
+            "chat": _CHAT,
+            "from": _USER,
+            "sticker": {
+                "file_id": "CAACAgIAAxkBAAEBQ2Zl",
+                "file_unique_id": "AgADmQADwDZPEw",
+                "type": "regular",
+                "width": 512,
+                "height": 512,
+                "is_animated": False,
+                "is_video": False,
+                "emoji": "👍",
+            },
+        },
+    }
+
+
+def photo_update(update_id: int) -> dict[str, Any]:
+    """Build a raw Telegram update payload for a photo message."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1_700_000_000 + update_id,
+            "chat": _CHAT,
+            "from": _USER,
+            "photo": [
+                {
+                    "file_id": f"AgACAgIAAxkBAAIB{size}",
+                    "file_unique_id": f"AQADx{size}",
+                    "width": size,
+                    "height": size,
+                    "file_size": size * 40,
+                }
+                for size in (90, 320, 800, 1280)
+            ],
+        },
+    }
+
+
+def edited_update(update_id: int, text: str) -> dict[str, Any]:
+    """Build a raw Telegram update payload for an edited text message."""
+    payload = text_update(update_id, text)
+    message = payload.pop("message")
+    message["edit_date"] = message["date"] + 5
+    payload["edited_message"] = message
+    return payload
+
+
+def webhook_payloads() -> list[dict[str, Any]]:
+    """Return a realistic mix of webhook payloads.
+
+    Most of the traffic is text, but stickers, photos and edits are common
+    enough in real chats that the webhook path has to deal with them too.
+    """
+    payloads = [text_update(i, text) for i, text in enumerate(MESSAGES, 1)]
+    next_id = len(payloads) + 1
+    payloads.append(sticker_update(next_id))
+    payloads.append(photo_update(next_id + 1))
+    payloads.append(edited_update(next_id + 2, "Пицца или роллы?"))
+    return payloads
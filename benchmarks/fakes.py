@@ -0,0 +1,65 @@
+"""Stand-ins for Telegram objects and configuration used by the benchmarks.
+
+The test suite reuses them through fixtures in ``tests/conftest.py``.
+"""
+
+from typing import Any
+
+from src.config import Config
+
+
+class FakeUser:
+    """Minimal stand-in for ``aiogram.types.User``."""
+
+    def __init__(self, user_id: int, username: str):
+        self.id = user_id
+        self.username = username
+
+
+class FakeChat:
+    """Minimal stand-in for ``aiogram.types.Chat``."""
+
+    def __init__(self, chat_id: int):
+        self.id = chat_id
+        self.type = "private"
+
+
+class FakeMessage:
+    """Minimal stand-in for ``aiogram.types.Message`` that records answers."""
+
+    def __init__(self, text: str, user_id: int = 424242):
+        self.text = text
+        self.message_id = 1
+        self.from_user = FakeUser(user_id, "ivan_decides")
+        self.chat = FakeChat(user_id)
+        self.answers = 0
+        self.reactions = 0
+
+    async def answer(self, text: str, **kwargs: Any) -> None:
+        self.answers += 1
+
+    async def react(self, reaction: Any, **kwargs: Any) -> None:
+        self.reactions += 1
+
+
+class FakeDispatcher:
+    """Stand-in for ``aiogram.Dispatcher`` that only counts fed updates."""
+
+    def __init__(self) -> None:
+        self.fed = 0
+
+    async def feed_update(self, bot: Any, update: Any, **kwargs: Any) -> None:
+        self.fed += 1
+
+    def resolve_used_update_types(self) -> list[str]:
+        return ["message", "edited_message", "inline_query"]
+
+
+def make_config() -> Config:
+    """Build a Config with dummy credentials suitable for tests and benchmarks."""
+    return Config(
+        bot_token="0000000000:" + "A" * 35,
+        api_key="bench-api-key",
+        use_webhook=True,
+        webhook_url="https://bench.invalid",
+    )
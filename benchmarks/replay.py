@@ -0,0 +1,245 @@
+"""Replay captured traffic through the dispatcher for capacity planning.
+
+Updates recorded with ``CAPTURE_FILE`` are fed back through
+``Dispatcher.feed_update`` with their original spacing, compressed by a speed
+factor, or as fast as possible. The Bot API and the LLM are stubbed: every
+call sleeps for a latency drawn from a profile and then succeeds. The profile
+is a fixed value or samples taken from a trace file written with
+``TRACE_FILE``.
+
+Usage:
+    python -m benchmarks.replay capture.jsonl.gz
+    python -m benchmarks.replay capture.jsonl.gz --speed 10
+    python -m benchmarks.replay capture.jsonl.gz --speed max --latency-from traces.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import Update
+
+from benchmarks.bench_hotpaths import silence_logging
+from benchmarks.fakes import make_config
+from src.handlers.decision_handler import DecisionHandler
+from src.services.traffic_capture import read_capture
+
+LLM_SPAN = "llm.chat.completions.create"
+
+
+class LatencyProfile:
+    """Draws latencies (in seconds) from recorded samples."""
+
+    def __init__(self, samples_ms: Sequence[float], seed: int = 0):
+        """Initialize the profile with samples in milliseconds."""
+        self.samples_ms = list(samples_ms) or [0.0]
+        self._random = random.Random(seed)
+
+    def sample(self) -> float:
+        """Return one latency in seconds."""
+        return self._random.choice(self.samples_ms) / 1000
+
+    @classmethod
+    def from_traces(cls, path: Path) -> tuple["LatencyProfile", "LatencyProfile"]:
+        """Build (llm, bot) profiles from span durations in a trace file."""
+        llm: list[float] = []
+        bot: list[float] = []
+
+        with path.open(encoding="utf-8") as traces:
+            for line in traces:
+                if not line.strip():
+                    continue
+                for resource in json.loads(line)["resourceSpans"]:
+                    for scope in resource["scopeSpans"]:
+                        for span in scope["spans"]:
+                            duration_ms = (
+                                int(span["endTimeUnixNano"])
+                                - int(span["startTimeUnixNano"])
+                            ) / 1e6
+                            if span["name"] == LLM_SPAN:
+                                llm.append(duration_ms)
+                            elif span["name"].startswith("bot."):
+                                bot.append(duration_ms)
+
+        return cls(llm), cls(bot)
+
+
+class StubBotApiMiddleware(BaseRequestMiddleware):
+    """Bot session middleware that answers every API call locally."""
+
+    def __init__(self, profile: LatencyProfile):
+        """Initialize the stub with a latency profile."""
+        self.profile = profile
+        self.calls = 0
+
+    async def __call__(self, make_request: Any, bot: Any, method: Any) -> Any:
+        """Sleep for a sampled latency instead of calling Telegram."""
+        self.calls += 1
+        await asyncio.sleep(self.profile.sample())
+        return True
+
+
+class StubCompletions:
+    """Stand-in for ``AsyncOpenAI().chat.completions`` with sampled latency."""
+
+    def __init__(self, profile: LatencyProfile):
+        """Initialize the stub with a latency profile."""
+        self.profile = profile
+        self.calls = 0
+        self._response = SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(
+                        content='{"choice": 1, "reason": "Ответ из реплея"}'
+                    )
+                )
+            ],
+            usage=None,
+        )
+
+    async def create(self, **params: Any) -> Any:
+        """Sleep for a sampled latency and return a valid decision."""
+        self.calls += 1
+        await asyncio.sleep(self.profile.sample())
+        return self._response
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def replay(
+    records: Sequence[tuple[float, dict[str, Any]]],
+    speed: float | None,
+    llm_profile: LatencyProfile,
+    bot_profile: LatencyProfile,
+) -> dict[str, Any]:
+    """Feed captured updates through a stubbed dispatcher and report results.
+
+    Args:
+        records: ``(arrival time, raw update)`` pairs in arrival order
+        speed: Time compression factor, or None to replay as fast as possible
+        llm_profile: Latency profile for LLM calls
+        bot_profile: Latency profile for Bot API calls
+
+    Returns:
+        Summary with throughput, latency percentiles and backend call counts
+    """
+    config = make_config()
+    handler = DecisionHandler(config)
+    completions = StubCompletions(llm_profile)
+    handler.openai_client.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=completions)
+    )
+
+    bot = Bot(token=config.bot_token)
+    bot_api = StubBotApiMiddleware(bot_profile)
+    bot.session.middleware(bot_api)
+
+    dp = Dispatcher()
+    dp.include_router(handler.router)
+
+    latencies: list[float] = []
+    errors = 0
+
+    async def feed(data: dict[str, Any]) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            update = Update.model_validate(data, context={"bot": bot})
+            await dp.feed_update(bot, update)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first_arrival = records[0][0] if records else 0.0
+    tasks = []
+
+    try:
+        for arrival, data in records:
+            if speed:
+                delay = started + (arrival - first_arrival) / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(feed(data)))
+
+        await asyncio.gather(*tasks)
+    finally:
+        await bot.session.close()
+
+    wall = loop.time() - started
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return {
+        "updates": len(records),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(len(records) / wall, 1) if wall else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 1),
+            "p95": round(percentile(latencies_ms, 95), 1),
+            "p99": round(percentile(latencies_ms, 99), 1),
+            "max": round(max(latencies_ms, default=0.0), 1),
+            "mean": round(statistics.fmean(latencies_ms), 1) if latencies_ms else 0,
+        },
+        "llm_calls": completions.calls,
+        "bot_api_calls": bot_api.calls,
+        "admission": handler.admission.stats(),
+        "advice_cache": {
+            "hits": handler.openai_client.cache.hits,
+            "misses": handler.openai_client.cache.misses,
+        },
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path, help="gzip JSONL capture file")
+    parser.add_argument(
+        "--speed",
+        default="1",
+        help="time compression factor (1, 10, ...) or 'max'",
+    )
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--bot-latency-ms", type=float, default=60)
+    parser.add_argument(
+        "--latency-from",
+        type=Path,
+        help="trace JSONL file to sample LLM and Bot API latencies from",
+    )
+    args = parser.parse_args(argv)
+
+    speed = None if args.speed == "max" else float(args.speed)
+
+    llm_profile = LatencyProfile([args.llm_latency_ms])
+    bot_profile = LatencyProfile([args.bot_latency_ms])
+    if args.latency_from:
+        llm_profile, bot_profile = LatencyProfile.from_traces(args.latency_from)
+
+    silence_logging()
+    records = list(read_capture(str(args.capture)))
+    report = asyncio.run(replay(records, speed, llm_profile, bot_profile))
+
+    print(json.dumps(report, indent=2))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,132 @@
 """Main entry point for the Decision Bot."""
 
 import asyncio
+import hmac
 import logging
+import secrets
+import signal
+from collections import Counter
 
 import structlog
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from aiogram.types import Update
 from aiohttp import web
 from dotenv import load_dotenv
 
 from src.config import create_config
 from src.handlers.decision_handler import DecisionHandler
+from src.services.diagnostics import LoopLagMonitor, SamplingProfiler
+from src.services.tracing import (
+    BotApiTracingMiddleware,
+    UpdateTracingMiddleware,
+    tracer,
+)
+from src.services.traffic_capture import TrafficRecorder, UpdateCaptureMiddleware
+from src.services.update_dedup import SeenUpdates
+from src.services.update_filter import UpdateFilter, json_loads
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
 
 
 async def health_check(request):
-    """Health check endpoint for Railway."""
-    return web.json_response({"status": "healthy", "service": "decision-bot"})
+    """Health check endpoint for Railway.
+
+    Reports 503 "degraded" while the admission controller is saturated so
+    the platform can stop routing traffic to this instance.
+    """
+    admission = request.app.get("admission")
+    reasons = admission.saturation() if admission else []
+
+    if reasons:
+        return web.json_response(
+            {
+                "status": "degraded",
+                "ready": False,
+                "service": "decision-bot",
+                "reasons": reasons,
+            },
+            status=503,
+        )
+
+    return web.json_response(
+        {"status": "healthy", "ready": True, "service": "decision-bot"}
+    )
+
+
+async def metrics_handler(request):
+    """Expose internal counters as JSON."""
+    metrics = {}
+
+    update_filter = request.app.get("update_filter")
+    if update_filter:
+        metrics["updates"] = update_filter.stats()
+
+    webhook_stats = request.app.get("webhook_stats")
+    if webhook_stats is not None:
+        metrics["webhook"] = {
+            "rejected": webhook_stats["rejected"],
+            "duplicates": webhook_stats["duplicates"],
+        }
+
+    loop_monitor = request.app.get("loop_monitor")
+    if loop_monitor:
+        metrics["event_loop"] = loop_monitor.stats()
+
+    admission = request.app.get("admission")
+    if admission:
+        metrics["admission"] = admission.stats()
+
+    return web.json_response(metrics)
+
+
+def _is_admin(request) -> bool:
+    """Check the request's bearer token against ADMIN_TOKEN."""
+    token = request.app["config"].admin_token
+    provided = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    return bool(token) and hmac.compare_digest(provided.encode(), token.encode())
+
+
+async def profile_handler(request):
+    """Sample the event loop thread for N seconds and return collapsed stacks."""
+    if not _is_admin(request):
+        return web.Response(status=401)
+
+    config = request.app["config"]
+    profiler = request.app["profiler"]
+
+    try:
+        seconds = float(request.query.get("seconds", "10"))
+    except ValueError:
+        return web.Response(status=400, text="seconds must be a number")
+    seconds = min(max(seconds, 0.1), config.profile_max_seconds)
+
+    collapsed = await profiler.profile(seconds)
+    if collapsed is None:
+        return web.Response(status=409, text="Profiling already in progress")
+    return web.Response(text=collapsed, content_type="text/plain")
+
+
+async def start_loop_monitor(app: web.Application) -> None:
+    """Start the event loop lag monitor with the web app."""
+    app["loop_monitor"].start()
+
+
+async def stop_loop_monitor(app: web.Application) -> None:
+    """Stop the event loop lag monitor."""
+    await app["loop_monitor"].stop()
+
+
+def ensure_webhook_secret(config) -> str:
+    """Return the webhook secret, generating one if none is configured.
+
+    ``main`` registers the webhook on every start, so a random per-process
+    secret is enough to keep verification on without extra setup.
+    """
+    if not config.webhook_secret:
+        config.webhook_secret = secrets.token_urlsafe(32)
+    return config.webhook_secret
 
 
 async def webhook_handler(request):
@@ -27,12 +137,42 @@ async def webhook_handler(request):
 
     bot = request.app["bot"]
     dp = request.app["dispatcher"]
-
+    update_filter = request.app["update_filter"]
+    seen_updates = request.app["seen_updates"]
+    webhook_stats = request.app["webhook_stats"]
+
+    # Reject requests that do not come from Telegram before reading the body
+    secret = request.app["config"].webhook_secret
+    if secret:
+        provided = request.headers.get(SECRET_TOKEN_HEADER, "")
+        if not hmac.compare_digest(provided.encode(), secret.encode()):
+            webhook_stats["rejected"] += 1
+            logger.warning("Rejected webhook request with invalid secret token")
+            return web.Response(status=401)
+
+    # Decode and check the shape first so ignored updates never reach pydantic
     try:
-        data = await request.json()
-        from aiogram.types import Update
+        data = json_loads(await request.read())
+    except ValueError as e:
+        logger.warning("Malformed webhook payload", error=str(e))
+        return web.Response(status=400)
+
+    recorder = request.app.get("recorder")
+    if recorder and isinstance(data, dict):
+        recorder.record(data)
+
+    # Acknowledge redeliveries without paying for a second LLM call
+    update_id = data.get("update_id") if isinstance(data, dict) else None
+    if isinstance(update_id, int) and seen_updates.check_and_add(update_id):
+        webhook_stats["duplicates"] += 1
+        logger.info("Duplicate update acknowledged", update_id=update_id)
+        return web.Response(status=200)
+
+    if not update_filter.accept(data):
+        return web.Response(status=200)
 
-        update = Update(**data)
+    try:
+        update = Update.model_validate(data, context={"bot": bot})
         await dp.feed_update(bot, update)
         return web.Response(status=200)
     except Exception as e:
@@ -40,14 +180,44 @@ async def webhook_handler(request):
         return web.Response(status=500)
 
 
-async def create_app(bot=None, dp=None, config=None) -> web.Application:
+async def create_app(
+    bot=None, dp=None, config=None, admission=None, recorder=None
+) -> web.Application:
     """Create aiohttp application with health check and webhook."""
     app = web.Application()
     app.router.add_get("/health", health_check)
+    app.router.add_get("/metrics", metrics_handler)
+
+    if admission:
+        app["admission"] = admission
+
+    if config:
+        app["config"] = config
+        app["loop_monitor"] = LoopLagMonitor(threshold_ms=config.loop_lag_threshold_ms)
+        app.on_startup.append(start_loop_monitor)
+        app.on_cleanup.append(stop_loop_monitor)
+
+        if admission:
+            admission.loop_monitor = app["loop_monitor"]
+
+        # Admin diagnostics are only exposed when a token is configured
+        if config.admin_token:
+            app["profiler"] = SamplingProfiler()
+            app.router.add_get("/admin/profile", profile_handler)
 
     if bot and dp and config and config.use_webhook:
         app["bot"] = bot
         app["dispatcher"] = dp
+        app["update_filter"] = UpdateFilter(
+            handled_types=dp.resolve_used_update_types(),
+            text_types=("message", "edited_message"),
+        )
+        app["seen_updates"] = SeenUpdates(
+            maxsize=config.update_dedup_size, ttl=config.update_dedup_ttl
+        )
+        app["webhook_stats"] = Counter()
+        if recorder:
+            app["recorder"] = recorder
         app.router.add_post(config.webhook_path, webhook_handler)
 
     return app
@@ -61,6 +231,7 @@ async def main() -> None:
     # Configure logging
     structlog.configure(
         processors=[
+            structlog.contextvars.merge_contextvars,
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.dev.ConsoleRenderer(),
         ],
@@ -81,10 +252,38 @@ async def main() -> None:
 
     dp = Dispatcher()
 
+    # Trace every update and every Bot API call
+    if config.trace_file:
+        tracer.configure(
+            config.trace_file,
+            sample_rate=config.trace_sample_rate,
+            slow_ms=config.trace_slow_ms,
+            max_bytes=config.trace_max_bytes,
+            backup_count=config.trace_backup_count,
+        )
+    dp.update.outer_middleware(UpdateTracingMiddleware())
+    bot.session.middleware(BotApiTracingMiddleware())
+
+    # Record raw updates for replay; webhook_handler records in webhook mode
+    recorder = None
+    if config.capture_file:
+        recorder = TrafficRecorder(config.capture_file, config.capture_anonymize)
+        if not config.use_webhook:
+            dp.update.outer_middleware(UpdateCaptureMiddleware(recorder))
+
     # Register handlers
-    decision_handler = DecisionHandler()
+    decision_handler = DecisionHandler(config)
     dp.include_router(decision_handler.router)
 
+    # Stop on SIGTERM (container stop, redeploy) through the finally block
+    # below, so the bot session and the traffic capture are closed cleanly
+    main_task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+    except NotImplementedError:
+        # Signal handlers are not available on Windows event loops
+        pass
+
     logger.info(
         "Starting Decision Bot",
         version="1.0.0",
@@ -100,8 +299,12 @@ async def main() -> None:
             logger.error("Failed to authenticate bot", error=str(e))
             raise
 
+        # Webhook requests are always verified against a secret token
+        if config.use_webhook:
+            ensure_webhook_secret(config)
+
         # Create web app with or without webhook
-        app = await create_app(bot, dp, config)
+        app = await create_app(bot, dp, config, decision_handler.admission, recorder)
 
         if config.use_webhook:
             # Webhook mode - no conflicts possible
@@ -114,7 +317,8 @@ async def main() -> None:
             await bot.set_webhook(
                 url=webhook_url,
                 drop_pending_updates=True,
-                allowed_updates=["message", "callback_query"],
+                allowed_updates=dp.resolve_used_update_types(),
+                secret_token=config.webhook_secret,
             )
             logger.info("Webhook set", url=webhook_url)
 
@@ -148,8 +352,10 @@ async def main() -> None:
                         await dp.start_polling(
                             bot,
                             polling_timeout=10,
-                            handle_as_tasks=False,
+                            handle_as_tasks=True,
                             drop_pending_updates=True,
+                            # SIGTERM cancels main() so the web server stops too
+                            handle_signals=False,
                         )
                         break
                     except Exception as e:
@@ -198,6 +404,8 @@ async def main() -> None:
 
     except KeyboardInterrupt:
         logger.info("Received interrupt signal, shutting down gracefully")
+    except asyncio.CancelledError:
+        logger.info("Received termination signal, shutting down gracefully")
     except Exception as e:
         logger.error("Bot crashed", error=str(e))
         raise
@@ -208,6 +416,9 @@ async def main() -> None:
         except Exception as e:
             logger.error("Error closing bot session", error=str(e))
 
+        if recorder:
+            recorder.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
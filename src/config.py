@@ -1,5 +1,6 @@
 """Configuration module for the Decision Bot."""
 
+import re
 import sys
 from typing import Any
 
@@ -14,13 +15,21 @@ class Config(BaseSettings):
     """Configuration settings for the bot."""
 
     # Telegram Bot Token
-    bot_token: str = Field(..., env="BOT_TOKEN", description="Telegram Bot Token from @BotFather")
+    bot_token: str = Field(
+        ..., env="BOT_TOKEN", description="Telegram Bot Token from @BotFather"
+    )
 
     # LLM API Configuration
     api_type: str = Field(default="openrouter", env="API_TYPE")
-    api_key: str = Field(..., env="API_KEY", description="API Key (OpenRouter or OpenAI)")
-    api_base: str = Field(default="https://openrouter.ai/api/v1", env="API_BASE", description="API Base URL")
-    
+    api_key: str = Field(
+        ..., env="API_KEY", description="API Key (OpenRouter or OpenAI)"
+    )
+    api_base: str = Field(
+        default="https://openrouter.ai/api/v1",
+        env="API_BASE",
+        description="API Base URL",
+    )
+
     # Model Configuration
     model: str = Field(default="gpt-4.1-mini", env="MODEL")
 
@@ -33,11 +42,49 @@ class Config(BaseSettings):
     # Bot Configuration
     max_options: int = Field(default=5, env="MAX_OPTIONS")
     response_timeout: int = Field(default=30, env="RESPONSE_TIMEOUT")
-    
+    structured_output: bool = Field(default=True, env="STRUCTURED_OUTPUT")
+    llm_max_retries: int = Field(default=1, env="LLM_MAX_RETRIES")
+
     # Deployment Configuration
     use_webhook: bool = Field(default=False, env="USE_WEBHOOK")
     webhook_url: str | None = Field(default=None, env="WEBHOOK_URL")
     webhook_path: str = Field(default="/webhook", env="WEBHOOK_PATH")
+    webhook_secret: str | None = Field(default=None, env="WEBHOOK_SECRET")
+    update_dedup_size: int = Field(default=10_000, env="UPDATE_DEDUP_SIZE")
+    update_dedup_ttl: int = Field(default=600, env="UPDATE_DEDUP_TTL")
+
+    # Tracing Configuration
+    trace_file: str | None = Field(default=None, env="TRACE_FILE")
+    trace_sample_rate: float = Field(default=0.05, env="TRACE_SAMPLE_RATE")
+    trace_slow_ms: int = Field(default=2000, env="TRACE_SLOW_MS")
+    trace_max_bytes: int = Field(default=10 * 1024 * 1024, env="TRACE_MAX_BYTES")
+    trace_backup_count: int = Field(default=5, env="TRACE_BACKUP_COUNT")
+
+    # Traffic Capture Configuration
+    capture_file: str | None = Field(default=None, env="CAPTURE_FILE")
+    capture_anonymize: bool = Field(default=True, env="CAPTURE_ANONYMIZE")
+
+    # Diagnostics Configuration
+    admin_token: str | None = Field(default=None, env="ADMIN_TOKEN")
+    profile_max_seconds: float = Field(default=60, env="PROFILE_MAX_SECONDS")
+    loop_lag_threshold_ms: float = Field(default=100, env="LOOP_LAG_THRESHOLD_MS")
+
+    # Load Shedding Configuration
+    max_inflight_handlers: int = Field(default=100, env="MAX_INFLIGHT_HANDLERS")
+    max_inflight_llm_calls: int = Field(default=20, env="MAX_INFLIGHT_LLM_CALLS")
+    max_loop_lag_ms: float = Field(default=500, env="MAX_LOOP_LAG_MS")
+
+    # Inline Mode Configuration
+    inline_debounce_ms: int = Field(default=300, env="INLINE_DEBOUNCE_MS")
+    inline_cache_time: int = Field(default=30, env="INLINE_CACHE_TIME")
+    advice_cache_size: int = Field(default=1024, env="ADVICE_CACHE_SIZE")
+
+    # Conversation Memory Configuration
+    memory_turns: int = Field(default=4, env="MEMORY_TURNS")
+    memory_max_chats: int = Field(default=10_000, env="MEMORY_MAX_CHATS")
+    memory_max_bytes: int = Field(default=8 * 1024 * 1024, env="MEMORY_MAX_BYTES")
+    context_token_budget: int = Field(default=200, env="CONTEXT_TOKEN_BUDGET")
+    follow_up_window: int = Field(default=600, env="FOLLOW_UP_WINDOW")
 
     @field_validator("bot_token")
     @classmethod
@@ -47,6 +94,16 @@ class Config(BaseSettings):
             raise ValueError("Invalid BOT_TOKEN format. Should be from @BotFather")
         return v
 
+    @field_validator("webhook_secret")
+    @classmethod
+    def validate_webhook_secret(cls, v: str | None) -> str | None:
+        """Validate webhook secret token format required by Telegram."""
+        if v and not re.fullmatch(r"[A-Za-z0-9_-]{1,256}", v):
+            raise ValueError(
+                "WEBHOOK_SECRET must be 1-256 characters of A-Z, a-z, 0-9, _ and -"
+            )
+        return v
+
     @field_validator("api_key")
     @classmethod
     def validate_api_key(cls, v: str) -> str:
@@ -64,46 +121,48 @@ def create_config() -> Config:
         return Config()
     except ValidationError as e:
         logger.error("Configuration validation failed")
-        
+
         # Extract missing fields and provide helpful error messages
         missing_vars = []
         invalid_vars = []
-        
+
         for error in e.errors():
             field_name = error["loc"][0] if error["loc"] else "unknown"
             error_type = error["type"]
-            
+
             if error_type == "missing":
                 if field_name == "bot_token":
-                    missing_vars.append("BOT_TOKEN - Get it from @BotFather in Telegram")
+                    missing_vars.append(
+                        "BOT_TOKEN - Get it from @BotFather in Telegram"
+                    )
                 elif field_name == "api_key":
                     missing_vars.append("API_KEY - Get it from openrouter.ai/keys")
                 else:
                     missing_vars.append(f"{field_name.upper()}")
             else:
                 invalid_vars.append(f"{field_name.upper()}: {error['msg']}")
-        
+
         error_msg = "❌ Configuration Error!\n\n"
-        
+
         if missing_vars:
             error_msg += "Missing required environment variables:\n"
             for var in missing_vars:
                 error_msg += f"  • {var}\n"
             error_msg += "\n"
-        
+
         if invalid_vars:
             error_msg += "Invalid environment variables:\n"
             for var in invalid_vars:
                 error_msg += f"  • {var}\n"
             error_msg += "\n"
-        
+
         error_msg += "Please set these variables in Railway:\n"
         error_msg += "1. Go to your Railway project dashboard\n"
         error_msg += "2. Open 'Variables' tab\n"
         error_msg += "3. Add the missing variables\n"
         error_msg += "4. Redeploy the application\n\n"
         error_msg += "See QUICK_DEPLOY.md for detailed instructions."
-        
+
         print(error_msg)
         logger.error("Configuration error", error=error_msg)
         sys.exit(1)
@@ -1,13 +1,29 @@
 """Decision handler for processing user messages and generating advice."""
 
+import asyncio
+import hashlib
+import html
+import sys
+from collections.abc import Awaitable, Hashable
+from typing import Any
+
 import structlog
 from aiogram import F, Router
 from aiogram.filters import Command
-from aiogram.types import Message
+from aiogram.types import (
+    InlineQuery,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+    Message,
+    ReactionTypeEmoji,
+)
 
-from src.config import create_config
-from src.services.openai_client import LLMClient
+from src.config import Config, create_config
+from src.services.admission import AdmissionController
+from src.services.conversation_memory import ConversationMemory
+from src.services.openai_client import ERROR_MESSAGES, LLMClient
 from src.services.option_parser import OptionParser
+from src.services.tracing import tracer
 
 logger = structlog.get_logger()
 
@@ -15,17 +31,40 @@ logger = structlog.get_logger()
 class DecisionHandler:
     """Handler for decision-making requests."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        config: Config | None = None,
+        admission: AdmissionController | None = None,
+    ):
         """Initialize the decision handler."""
         self.router = Router()
-        self.config = create_config()
+        self.config = config or create_config()
         self.option_parser = OptionParser(max_options=self.config.max_options)
         self.openai_client = LLMClient(self.config)
+        self.admission = admission or AdmissionController(
+            max_handlers=self.config.max_inflight_handlers,
+            max_llm_calls=self.config.max_inflight_llm_calls,
+            max_loop_lag_ms=self.config.max_loop_lag_ms,
+        )
+        self.memory = ConversationMemory(
+            max_turns=self.config.memory_turns,
+            max_chats=self.config.memory_max_chats,
+            max_bytes=self.config.memory_max_bytes,
+            token_budget=self.config.context_token_budget,
+            follow_up_window=self.config.follow_up_window,
+        )
+
+        # Tasks awaiting the LLM per (chat, user), cancelled when superseded
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        # Latest inline query sequence number per user, for debouncing
+        self._inline_seq: dict[int, int] = {}
 
         # Register message handlers
         self.router.message(Command("start"))(self.start_command)
         self.router.message(Command("help"))(self.help_command)
         self.router.message(F.text)(self.handle_decision_request)
+        self.router.edited_message(F.text)(self.handle_decision_request)
+        self.router.inline_query()(self.handle_inline_query)
 
     async def start_command(self, message: Message) -> None:
         """Handle /start command."""
@@ -74,6 +113,11 @@ class DecisionHandler:
 
     async def handle_decision_request(self, message: Message) -> None:
         """Handle user message with decision request."""
+        with self.admission.handler():
+            await self._process_decision_request(message)
+
+    async def _process_decision_request(self, message: Message) -> None:
+        """Parse options from the message and answer with advice."""
         if not message.text:
             return
 
@@ -87,16 +131,21 @@ class DecisionHandler:
             message_length=len(message.text),
         )
 
-        # Send "thinking" reaction
-        try:
-            from aiogram.types import ReactionTypeEmoji
-            await message.react([ReactionTypeEmoji(emoji="🤔")])
-        except Exception as e:
-            # Skip reaction if not supported
-            logger.debug("Could not set reaction", error=str(e))
-
         # Parse options from message
-        options = self.option_parser.parse_options(message.text)
+        with tracer.span("handler.parse") as span:
+            options = self.option_parser.parse_options(message.text)
+            span.set_attribute("options.count", len(options) if options else 0)
+
+        chat_id = message.chat.id
+        context = None
+
+        # A short question without options follows up on the previous one;
+        # only then is the chat history sent, so new questions stay cacheable
+        if not options or len(options) < 2:
+            previous = self.memory.follow_up(chat_id, message.text)
+            if previous:
+                options = list(previous)
+                context = self.memory.context(chat_id, clarification=message.text)
 
         if not options:
             error_text = (
@@ -116,14 +165,42 @@ class DecisionHandler:
             )
             return
 
+        # Answer locally, before any Bot API round-trip, when saturated
+        if not self.admission.try_admit():
+            fallback_advice = self._generate_fallback_advice(options)
+            with tracer.span("handler.answer", fallback=True, shed=True):
+                await message.answer(f"🎯 {fallback_advice}")
+            self._remember(chat_id, message.text, options, fallback_advice)
+            return
+
+        # Send "thinking" reaction
+        with tracer.span("handler.react"):
+            try:
+                await message.react([ReactionTypeEmoji(emoji="🤔")])
+            except Exception as e:
+                # Skip reaction if not supported
+                logger.debug("Could not set reaction", error=str(e))
+
         # Generate advice using OpenAI
         try:
-            advice = await self.openai_client.get_decision_advice(options)
+            with tracer.span("handler.llm"), self.admission.llm_call():
+                superseded, advice = await self._run_superseding(
+                    (message.chat.id, user_id),
+                    self.openai_client.get_decision_advice(options, context),
+                )
+
+            if superseded:
+                # A newer message from the same user replaced this one
+                logger.info("Superseded decision request dropped", user_id=user_id)
+                return
 
             if advice:
                 # Format the response
                 response_text = f"🎯 {advice}"
-                await message.answer(response_text)
+                with tracer.span("handler.answer"):
+                    await message.answer(response_text)
+                if advice not in ERROR_MESSAGES:
+                    self._remember(chat_id, message.text, options, advice)
 
                 logger.info(
                     "Decision advice sent successfully",
@@ -134,7 +211,9 @@ class DecisionHandler:
             else:
                 # Fallback response if OpenAI fails
                 fallback_advice = self._generate_fallback_advice(options)
-                await message.answer(f"🎯 {fallback_advice}")
+                with tracer.span("handler.answer", fallback=True):
+                    await message.answer(f"🎯 {fallback_advice}")
+                self._remember(chat_id, message.text, options, fallback_advice)
 
                 logger.warning(
                     "Used fallback advice due to OpenAI failure",
@@ -152,6 +231,94 @@ class DecisionHandler:
                 "Попробуй ещё раз через несколько секунд."
             )
 
+    async def handle_inline_query(self, inline_query: InlineQuery) -> None:
+        """Answer "@bot пицца или суши" from the cache or the local engine.
+
+        Telegram sends a query per keystroke, so each one waits for a short
+        debounce window and is dropped if a newer query from the same user
+        arrived meanwhile. The LLM is never called here: inline answers have
+        a tight deadline, so cached advice or local fallback advice is used.
+        """
+        user_id = inline_query.from_user.id
+        seq = self._inline_seq.get(user_id, 0) + 1
+        self._inline_seq[user_id] = seq
+
+        await asyncio.sleep(self.config.inline_debounce_ms / 1000)
+        if self._inline_seq.get(user_id) != seq:
+            return
+        del self._inline_seq[user_id]
+
+        with tracer.span("handler.inline") as span:
+            options = self.option_parser.parse_options(inline_query.query)
+            if not options or len(options) < 2:
+                await inline_query.answer(
+                    [], cache_time=self.config.inline_cache_time, is_personal=True
+                )
+                return
+
+            advice = self.openai_client.cached_advice(options)
+            span.set_attribute("cache.hit", advice is not None)
+            if advice is None:
+                advice = self._generate_fallback_advice(options)
+
+            # Advice is HTML already; the raw query and the plain-text title
+            # are not, and the message goes out in the bot's HTML parse mode
+            text = f"{html.escape(inline_query.query)}\n\n🎯 {advice}"
+            result = InlineQueryResultArticle(
+                id=hashlib.md5(text.encode()).hexdigest(),
+                title=f"🎯 {html.unescape(advice)}",
+                description=" / ".join(options),
+                input_message_content=InputTextMessageContent(message_text=text),
+            )
+            await inline_query.answer(
+                [result], cache_time=self.config.inline_cache_time, is_personal=True
+            )
+
+    async def _run_superseding(
+        self, key: Hashable, coro: Awaitable[str | None]
+    ) -> tuple[bool, str | None]:
+        """Await ``coro`` as the only in-flight call for ``key``.
+
+        A previous call still running for the same key is cancelled. The
+        calling task itself is registered and cancelled rather than wrapping
+        ``coro`` in a task of its own, so an uncontended call costs no extra
+        task or event loop iteration.
+
+        Returns:
+            ``(superseded, result)``; result is None if a newer call
+            superseded this one
+        """
+        current = asyncio.current_task()
+        assert current is not None
+
+        previous = self._inflight.get(key)
+        if previous is not None and not previous.done():
+            previous.cancel()
+        self._inflight[key] = current
+
+        try:
+            return False, await coro
+        except asyncio.CancelledError:
+            # Swallow only our own supersede; re-raise if we were cancelled
+            if self._inflight.get(key) is current:
+                raise
+            if sys.version_info >= (3, 11):
+                current.uncancel()
+            return True, None
+        finally:
+            if self._inflight.get(key) is current:
+                del self._inflight[key]
+
+    def _remember(
+        self, chat_id: Hashable, text: str, options: list[str], advice: str
+    ) -> None:
+        """Store an exchange in memory with the advice as plain text.
+
+        Advice is HTML-escaped for Telegram, but the memory feeds LLM prompts
+        and matches options against the advice, so entities are decoded.
+        """
+        self.memory.add(chat_id, text, options, html.unescape(advice))
+
     def _generate_fallback_advice(self, options: list[str]) -> str:
         """Generate simple fallback advice when OpenAI is unavailable."""
         import random
@@ -166,4 +333,4 @@ class DecisionHandler:
         ]
 
         reason = random.choice(fallback_reasons)
-        return f"Рекомендую {chosen_option}. {reason}"
+        return f"Рекомендую {html.escape(chosen_option)}. {reason}"
@@ -0,0 +1,109 @@
+"""Admission control driven by live saturation signals."""
+
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class _Counter:
+    """Context manager that tracks one in-flight operation on the controller."""
+
+    __slots__ = ("_controller", "_attr")
+
+    def __init__(self, controller: "AdmissionController", attr: str):
+        self._controller = controller
+        self._attr = attr
+
+    def __enter__(self) -> None:
+        setattr(self._controller, self._attr, getattr(self._controller, self._attr) + 1)
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        setattr(self._controller, self._attr, getattr(self._controller, self._attr) - 1)
+
+
+class AdmissionController:
+    """Decide whether new work can be admitted or should be shed.
+
+    Tracks in-flight handlers and LLM calls and reads event loop lag from a
+    ``LoopLagMonitor`` if one is attached. Each threshold is a capacity:
+    once any signal reaches it the process is saturated. New requests should
+    then be answered locally instead of queuing behind the LLM, and
+    readiness is reported as degraded so the platform can shift traffic away.
+    """
+
+    def __init__(
+        self,
+        max_handlers: int = 100,
+        max_llm_calls: int = 20,
+        max_loop_lag_ms: float = 500,
+        loop_monitor: Any = None,
+    ):
+        """Initialize the controller with saturation thresholds."""
+        self.max_handlers = max_handlers
+        self.max_llm_calls = max_llm_calls
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.loop_monitor = loop_monitor
+
+        self.inflight_handlers = 0
+        self.inflight_llm_calls = 0
+        self.admitted = 0
+        self.shed = 0
+
+        self._handler_counter = _Counter(self, "inflight_handlers")
+        self._llm_counter = _Counter(self, "inflight_llm_calls")
+
+    def handler(self) -> _Counter:
+        """Track a running handler: ``with admission.handler(): ...``."""
+        return self._handler_counter
+
+    def llm_call(self) -> _Counter:
+        """Track a running LLM call: ``with admission.llm_call(): ...``."""
+        return self._llm_counter
+
+    def saturation(self, own_handlers: int = 0) -> list[str]:
+        """Return the signals currently at or past their thresholds.
+
+        Args:
+            own_handlers: Tracked handlers belonging to the caller, which are
+                not counted against ``max_handlers``
+        """
+        reasons = []
+        if self.inflight_handlers - own_handlers >= self.max_handlers:
+            reasons.append("inflight_handlers")
+        if self.inflight_llm_calls >= self.max_llm_calls:
+            reasons.append("inflight_llm_calls")
+        if self.loop_monitor and self.loop_monitor.lag_ms >= self.max_loop_lag_ms:
+            reasons.append("event_loop_lag")
+        return reasons
+
+    def try_admit(self) -> bool:
+        """Admit new LLM-bound work unless the process is saturated.
+
+        Called from inside ``handler()``, so the calling handler itself does
+        not count: with ``max_handlers=N`` up to N handlers are admitted.
+        """
+        reasons = self.saturation(own_handlers=1)
+        if reasons:
+            self.shed += 1
+            logger.warning(
+                "Shedding load",
+                reasons=reasons,
+                inflight_handlers=self.inflight_handlers,
+                inflight_llm_calls=self.inflight_llm_calls,
+            )
+            return False
+
+        self.admitted += 1
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Return current counters and saturation state."""
+        return {
+            "inflight_handlers": self.inflight_handlers,
+            "inflight_llm_calls": self.inflight_llm_calls,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "saturated": self.saturation(),
+        }
@@ -0,0 +1,49 @@
+"""In-memory LRU cache of decision advice keyed by the option set."""
+
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from src.services.structured_output import Decision
+
+
+class AdviceCache:
+    """Bounded LRU cache mapping a set of options to previously given advice.
+
+    Values are either a structured ``Decision`` (option index and reason,
+    rendered on each hit) or free-form advice text.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """Initialize the cache with a maximum number of entries."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, ...], Decision | str] = OrderedDict()
+
+    @staticmethod
+    def key(options: Sequence[str]) -> tuple[str, ...]:
+        """Normalize options so trivial differences share one entry."""
+        return tuple(" ".join(option.casefold().split()) for option in options)
+
+    def get(self, options: Sequence[str]) -> Decision | str | None:
+        """Return cached advice for the options, if any."""
+        key = self.key(options)
+        advice = self._entries.get(key)
+        if advice is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return advice
+
+    def put(self, options: Sequence[str], advice: Decision | str) -> None:
+        """Store advice for the options, evicting the least recently used."""
+        key = self.key(options)
+        self._entries[key] = advice
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,212 @@
+"""Bounded per-chat conversation memory used as LLM context."""
+
+import sys
+import time
+from collections import OrderedDict, deque
+from collections.abc import Hashable, Sequence
+
+# Rough chars-per-token ratio for mixed Russian/English text
+CHARS_PER_TOKEN = 3
+
+# Longest request/advice text kept per exchange
+MAX_TEXT_LENGTH = 200
+
+# Longest rolling summary kept per chat
+MAX_SUMMARY_LENGTH = 300
+
+# Approximate fixed cost of one record in bytes, on top of its strings
+RECORD_OVERHEAD = 200
+
+# Longest message still treated as a follow-up question
+MAX_FOLLOW_UP_LENGTH = 100
+
+
+class Exchange:
+    """One request/answer pair; ``__slots__`` keeps records compact."""
+
+    __slots__ = ("request", "options", "advice", "at")
+
+    def __init__(self, request: str, options: tuple[str, ...], advice: str):
+        self.request = request
+        self.options = options
+        self.advice = advice
+        self.at = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        """Approximate memory footprint in bytes."""
+        strings = (self.request, self.advice, *self.options)
+        return RECORD_OVERHEAD + sum(sys.getsizeof(s) for s in strings)
+
+    def chosen_option(self) -> str | None:
+        """Return the option the advice recommended, if it can be found."""
+        advice = self.advice.casefold()
+        for option in self.options:
+            if option.casefold() in advice:
+                return option
+        return None
+
+
+class ChatMemory:
+    """Ring buffer of recent exchanges plus a summary of older ones."""
+
+    __slots__ = ("turns", "summary", "size")
+
+    def __init__(self, max_turns: int):
+        self.turns: deque[Exchange] = deque(maxlen=max_turns)
+        self.summary = ""
+        self.size = RECORD_OVERHEAD
+
+
+class ConversationMemory:
+    """Per-chat memory with LRU eviction and a hard global size cap.
+
+    Each chat keeps its last ``max_turns`` exchanges. Older exchanges are
+    folded into a short rolling summary instead of being kept verbatim, so
+    the context produced by ``context`` fits ``token_budget`` however long
+    the chat gets. Least recently used chats are evicted when there are more
+    than ``max_chats`` of them or the total size passes ``max_bytes``.
+
+    A short question sent within ``follow_up_window`` seconds of the last
+    exchange is a follow-up to it (see ``follow_up``).
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 4,
+        max_chats: int = 10_000,
+        max_bytes: int = 8 * 1024 * 1024,
+        token_budget: int = 200,
+        follow_up_window: float = 600,
+    ):
+        """Initialize the memory store."""
+        self.max_turns = max_turns
+        self.max_chats = max_chats
+        self.max_bytes = max_bytes
+        self.token_budget = token_budget
+        self.follow_up_window = follow_up_window
+        self.total_bytes = 0
+        self._chats: OrderedDict[Hashable, ChatMemory] = OrderedDict()
+
+    def add(
+        self, chat_id: Hashable, request: str, options: Sequence[str], advice: str
+    ) -> None:
+        """Remember an exchange in the chat."""
+        if self.max_turns <= 0:
+            return
+
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = ChatMemory(self.max_turns)
+            self.total_bytes += chat.size
+        self._chats.move_to_end(chat_id)
+
+        if len(chat.turns) == chat.turns.maxlen:
+            self._fold(chat, chat.turns[0])
+
+        exchange = Exchange(
+            request[:MAX_TEXT_LENGTH], tuple(options), advice[:MAX_TEXT_LENGTH]
+        )
+        chat.turns.append(exchange)
+        self._resize(chat, exchange.size)
+
+        self._evict()
+
+    def last_options(self, chat_id: Hashable) -> tuple[str, ...] | None:
+        """Return the options of the chat's latest exchange, if any."""
+        chat = self._chats.get(chat_id)
+        if not chat or not chat.turns:
+            return None
+        return chat.turns[-1].options
+
+    def follow_up(self, chat_id: Hashable, text: str) -> tuple[str, ...] | None:
+        """Return the previous options if ``text`` is a follow-up question.
+
+        Only a short question asked soon after the last exchange counts, so
+        greetings and thanks do not trigger a new decision.
+        """
+        chat = self._chats.get(chat_id)
+        if not chat or not chat.turns:
+            return None
+
+        text = text.strip()
+        if len(text) > MAX_FOLLOW_UP_LENGTH or not text.endswith("?"):
+            return None
+
+        last = chat.turns[-1]
+        if time.monotonic() - last.at > self.follow_up_window:
+            return None
+        return last.options
+
+    def context(
+        self, chat_id: Hashable, clarification: str | None = None
+    ) -> str | None:
+        """Build LLM context for the chat within the token budget.
+
+        The clarification (the follow-up message) is budgeted first, then
+        recent exchanges newest first while they fit, then as much of the
+        summary as still fits. The result reads oldest to newest and ends
+        with the clarification.
+        """
+        budget = self.token_budget * CHARS_PER_TOKEN
+        lines: list[str] = []
+
+        if clarification and budget > 0:
+            line = f"Уточнение: {clarification[:MAX_TEXT_LENGTH]}"[:budget]
+            lines.append(line)
+            budget -= len(line) + 1
+
+        chat = self._chats.get(chat_id)
+        if not chat:
+            return lines[0] if lines else None
+        self._chats.move_to_end(chat_id)
+
+        for exchange in reversed(chat.turns):
+            line = f"Пользователь: {exchange.request} → Бот: {exchange.advice}"
+            if len(line) > budget:
+                break
+            lines.append(line)
+            budget -= len(line) + 1
+
+        if chat.summary and budget > len("Ранее: ") + 10:
+            lines.append(f"Ранее: {chat.summary}"[:budget])
+
+        if not lines:
+            return None
+        return "\n".join(reversed(lines))
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of chats and the approximate size in bytes."""
+        return {"chats": len(self._chats), "bytes": self.total_bytes}
+
+    def _fold(self, chat: ChatMemory, exchange: Exchange) -> None:
+        """Fold an exchange leaving the ring buffer into the rolling summary."""
+        chosen = exchange.chosen_option()
+        fragment = " / ".join(exchange.options)
+        if chosen:
+            fragment += f" → {chosen}"
+
+        summary = f"{chat.summary}; {fragment}" if chat.summary else fragment
+        # Keep the most recent part of the summary
+        if len(summary) > MAX_SUMMARY_LENGTH:
+            summary = "…" + summary[-(MAX_SUMMARY_LENGTH - 1) :]
+
+        old_size = sys.getsizeof(chat.summary)
+        chat.summary = summary
+        self._resize(chat, sys.getsizeof(summary) - old_size - exchange.size)
+
+    def _resize(self, chat: ChatMemory, delta: int) -> None:
+        """Adjust size accounting for a chat."""
+        chat.size += delta
+        self.total_bytes += delta
+
+    def _evict(self) -> None:
+        """Evict least recently used chats until both caps are respected."""
+        while self._chats and (
+            len(self._chats) > self.max_chats or self.total_bytes > self.max_bytes
+        ):
+            _, chat = self._chats.popitem(last=False)
+            self.total_bytes -= chat.size
+
+    def __len__(self) -> int:
+        return len(self._chats)
@@ -0,0 +1,192 @@
+"""Runtime diagnostics: sampling profiler and event-loop lag monitor."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+def _frame_label(frame: FrameType) -> str:
+    """Describe a frame as ``function (file.py:line)`` for collapsed stacks."""
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def collapse_stack(frame: FrameType | None) -> str:
+    """Render a stack in collapsed format, outermost frame first."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Low-overhead sampling profiler for a single thread.
+
+    A background thread periodically reads the target thread's current frame
+    via ``sys._current_frames`` and counts identical stacks. The target
+    thread is never interrupted, so the overhead is bounded by the sampling
+    interval.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """Initialize the profiler with a sampling interval in seconds."""
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether a profiling session is in progress."""
+        return self._lock.locked()
+
+    def sample(self, thread_id: int, duration: float) -> Counter[str]:
+        """Sample ``thread_id`` for ``duration`` seconds (blocking)."""
+        stacks: Counter[str] = Counter()
+
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                stacks[collapse_stack(frame)] += 1
+            del frame
+            time.sleep(self.interval)
+
+        return stacks
+
+    async def profile(self, duration: float) -> str | None:
+        """Profile the event loop thread and return collapsed stacks.
+
+        Only one session runs at a time: returns None without sampling if
+        another session is already in progress.
+        """
+        # Acquired on the loop thread so concurrent callers cannot both pass
+        if not self._lock.acquire(blocking=False):
+            return None
+
+        try:
+            stacks = await asyncio.to_thread(
+                self.sample, threading.get_ident(), duration
+            )
+        finally:
+            self._lock.release()
+
+        return format_collapsed(stacks)
+
+
+def format_collapsed(stacks: Counter[str]) -> str:
+    """Format stack counts as ``frame;frame;frame count`` lines."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class LoopLagMonitor:
+    """Measure event-loop lag and capture what blocks the loop.
+
+    A coroutine on the loop sleeps for ``interval`` seconds and records how
+    late it wakes up. A watchdog thread checks the coroutine's heartbeat; if
+    the loop stops responding for longer than ``threshold_ms``, it logs the
+    loop thread's stack and the running task while the loop is still blocked.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold_ms: float = 100):
+        """Initialize the monitor."""
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.slow_ticks = 0
+        self.stalls = 0
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start measuring lag on the running loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+
+        self._task = asyncio.create_task(self._measure(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the monitor."""
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join)
+
+    def stats(self) -> dict[str, float]:
+        """Return current lag statistics."""
+        return {
+            "lag_ms": round(self.lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "slow_ticks": self.slow_ticks,
+            "stalls": self.stalls,
+        }
+
+    async def _measure(self) -> None:
+        """Sleep repeatedly and record how late the loop wakes us up."""
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            self.lag_ms = max(0.0, (now - started - self.interval) * 1000)
+            self.max_lag_ms = max(self.max_lag_ms, self.lag_ms)
+
+            if self.lag_ms >= self.threshold_ms:
+                self.slow_ticks += 1
+                logger.warning("Event loop lag", lag_ms=round(self.lag_ms, 1))
+
+    def _watch(self) -> None:
+        """Watchdog thread: snapshot the loop thread while it is blocked."""
+        reported_heartbeat = None
+
+        while not self._stopped.wait(self.threshold_ms / 1000 / 2):
+            heartbeat = self._heartbeat
+            blocked_ms = (time.monotonic() - heartbeat - self.interval) * 1000
+
+            if blocked_ms < self.threshold_ms or heartbeat == reported_heartbeat:
+                continue
+
+            # Report each stall once, while it is still happening
+            reported_heartbeat = heartbeat
+            self.stalls += 1
+
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            stack = "".join(traceback.format_stack(frame)) if frame else None
+            del frame
+
+            task = asyncio.current_task(self._loop) if self._loop else None
+            logger.warning(
+                "Event loop blocked",
+                blocked_ms=round(blocked_ms, 1),
+                task=task.get_name() if task else None,
+                coroutine=task.get_coro().__qualname__ if task else None,
+                stack=stack,
+            )
@@ -1,6 +1,9 @@
 """LLM client for generating decision advice (supports OpenRouter and OpenAI)."""
 
 import asyncio
+import html
+from typing import Any
+
 import httpx
 
 import openai
@@ -8,21 +11,40 @@ import structlog
 from openai import AsyncOpenAI
 
 from src.config import Config
+from src.services.advice_cache import AdviceCache
+from src.services.structured_output import (
+    STRUCTURED_MAX_TOKENS,
+    STRUCTURED_SYSTEM_PROMPT,
+    Decision,
+    parse_decision,
+    render_decision,
+)
+from src.services.tracing import tracer
 
 logger = structlog.get_logger()
 
+# User-facing texts returned instead of advice when the LLM call fails
+RATE_LIMIT_MESSAGE = "🚫 Извините, превышен лимит запросов к AI. Попробуйте позже."
+API_ERROR_MESSAGE = "🚫 Ошибка AI сервиса. Попробуйте позже."
+TIMEOUT_MESSAGE = "⏰ Превышено время ожидания ответа AI. Попробуйте позже."
+UNEXPECTED_ERROR_MESSAGE = "🚫 Произошла ошибка при генерации совета. Попробуйте позже."
+ERROR_MESSAGES = frozenset(
+    {RATE_LIMIT_MESSAGE, API_ERROR_MESSAGE, TIMEOUT_MESSAGE, UNEXPECTED_ERROR_MESSAGE}
+)
+
 
 class LLMClient:
     """Client for interacting with LLM APIs to generate decision advice."""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, cache: AdviceCache | None = None):
         """Initialize the LLM client."""
         self.config = config
-        
+        self.cache = cache or AdviceCache(maxsize=config.advice_cache_size)
+
         # Configure OpenAI client with appropriate base URL and API key
         self.client = AsyncOpenAI(
             api_key=config.api_key,
-            base_url=config.api_base if config.api_type == "openrouter" else None
+            base_url=config.api_base if config.api_type == "openrouter" else None,
         )
 
     async def get_decision_advice(
@@ -36,15 +58,27 @@ class LLMClient:
 
         Args:
             options: List of options to choose from
-            context: Additional context from user (future feature)
+            context: Conversation context for follow-up questions
             vote_results: Voting results from group chat (v1.1 feature)
 
         Returns:
-            Decision advice string or None if failed
+            HTML-escaped decision advice, one of ``ERROR_MESSAGES`` if the
+            call failed, or None if the response was unusable
         """
         try:
             prompt = self._build_prompt(options, context, vote_results)
 
+            # Only context-free advice is reusable for the same options
+            cacheable = not context and not vote_results
+
+            if self.config.structured_output:
+                if cacheable:
+                    cached = self.cached_advice(options)
+                    if cached:
+                        logger.info("Using cached decision", options_count=len(options))
+                        return cached
+                return await self._get_structured_advice(options, prompt, cacheable)
+
             logger.info(
                 "Requesting decision advice from LLM",
                 api_type=self.config.api_type,
@@ -52,28 +86,9 @@ class LLMClient:
                 options_count=len(options),
             )
 
-            # Build request parameters
-            params = {
-                "model": self.config.model,
-                "messages": [
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt},
-                ],
-                "max_tokens": 150,
-                "temperature": 0.7,
-                "timeout": self.config.response_timeout,
-            }
-            
-            # Add OpenRouter specific headers if needed
-            headers = {}
-            if self.config.api_type == "openrouter":
-                headers = {
-                    "HTTP-Referer": "https://github.com/anikitin2507/ideabot",
-                    "X-Title": "Decision Bot"
-                }
-                params["headers"] = headers
-
-            response = await self.client.chat.completions.create(**params)
+            response = await self._create_completion(
+                self._get_system_prompt(), prompt, max_tokens=150
+            )
 
             if not response.choices:
                 logger.error("No choices in LLM response")
@@ -84,7 +99,11 @@ class LLMClient:
                 logger.error("Empty content in LLM response")
                 return None
 
-            advice = advice.strip()
+            # Sent in HTML parse mode; the text may echo the user's options
+            advice = html.escape(advice.strip())
+
+            if cacheable:
+                self.cache.put(options, advice)
 
             logger.info(
                 "Generated decision advice successfully",
@@ -96,23 +115,111 @@ class LLMClient:
 
         except openai.RateLimitError as e:
             logger.error("LLM rate limit exceeded", error=str(e))
-            return "🚫 Извините, превышен лимит запросов к AI. Попробуйте позже."
+            return RATE_LIMIT_MESSAGE
 
         except openai.APIError as e:
             logger.error("LLM API error", error=str(e))
-            return "🚫 Ошибка AI сервиса. Попробуйте позже."
+            return API_ERROR_MESSAGE
 
         except httpx.TimeoutException:
             logger.error("LLM request timeout")
-            return "⏰ Превышено время ожидания ответа AI. Попробуйте позже."
+            return TIMEOUT_MESSAGE
 
         except asyncio.TimeoutError:
             logger.error("LLM request timeout")
-            return "⏰ Превышено время ожидания ответа AI. Попробуйте позже."
+            return TIMEOUT_MESSAGE
 
         except Exception as e:
-            logger.error("Unexpected error in LLM client", error=str(e), error_type=type(e).__name__)
-            return "🚫 Произошла ошибка при генерации совета. Попробуйте позже."
+            logger.error(
+                "Unexpected error in LLM client",
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            return UNEXPECTED_ERROR_MESSAGE
+
+    def cached_advice(self, options: list[str]) -> str | None:
+        """Return advice for options answered before, without calling the LLM."""
+        cached = self.cache.get(options)
+        if isinstance(cached, Decision):
+            return render_decision(options, cached)
+        return cached
+
+    async def _get_structured_advice(
+        self, options: list[str], prompt: str, cacheable: bool
+    ) -> str | None:
+        """Request a compact JSON decision, validate it and render it locally.
+
+        Invalid responses (not JSON, unknown option index, empty reason) are
+        retried up to ``llm_max_retries`` times; None is returned if none of
+        the attempts is valid so the caller can fall back.
+        """
+        logger.info(
+            "Requesting structured decision from LLM",
+            api_type=self.config.api_type,
+            model=self.config.model,
+            options_count=len(options),
+        )
+
+        for attempt in range(1 + self.config.llm_max_retries):
+            response = await self._create_completion(
+                STRUCTURED_SYSTEM_PROMPT, prompt, max_tokens=STRUCTURED_MAX_TOKENS
+            )
+            content = response.choices[0].message.content if response.choices else None
+            decision = parse_decision(content, len(options))
+
+            if decision:
+                if cacheable:
+                    self.cache.put(options, decision)
+
+                logger.info(
+                    "Generated structured decision successfully",
+                    choice=decision.index + 1,
+                    attempt=attempt + 1,
+                    tokens_used=response.usage.total_tokens if response.usage else None,
+                )
+                return render_decision(options, decision)
+
+            logger.warning(
+                "Invalid structured LLM response",
+                attempt=attempt + 1,
+                content=content,
+            )
+
+        return None
+
+    async def _create_completion(
+        self, system_prompt: str, prompt: str, max_tokens: int
+    ) -> Any:
+        """Send a chat completion request to the configured LLM API."""
+        # Build request parameters
+        params = {
+            "model": self.config.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.7,
+            "timeout": self.config.response_timeout,
+        }
+
+        # Add OpenRouter specific headers if needed
+        headers = {}
+        if self.config.api_type == "openrouter":
+            headers = {
+                "HTTP-Referer": "https://github.com/anikitin2507/ideabot",
+                "X-Title": "Decision Bot",
+            }
+            params["headers"] = headers
+
+        with tracer.span(
+            "llm.chat.completions.create", model=self.config.model
+        ) as span:
+            response = await self.client.chat.completions.create(**params)
+            if response.usage:
+                span.set_attribute("llm.total_tokens", response.usage.total_tokens)
+
+        return response
 
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the AI assistant."""
@@ -0,0 +1,91 @@
+"""Compact structured LLM decisions: prompt, validation and local rendering."""
+
+import html
+import random
+import re
+from typing import Any, NamedTuple
+
+import orjson
+
+# Room for {"choice": N, "reason": "..."} with a 15-word Russian reason
+STRUCTURED_MAX_TOKENS = 80
+
+MAX_REASON_LENGTH = 200
+
+STRUCTURED_SYSTEM_PROMPT = """Ты помощник для принятия решений. Выбери ОДИН вариант из пронумерованного списка.
+
+Ответь только JSON-объектом без пояснений и форматирования:
+{"choice": <номер выбранного варианта>, "reason": "<дружелюбное обоснование на русском, до 15 слов>"}
+"""
+
+ADVICE_TEMPLATES = (
+    "Рекомендую {option}. {reason}",
+    "Мой выбор — {option}. {reason}",
+    "Выбирай {option}. {reason}",
+)
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+class Decision(NamedTuple):
+    """A validated LLM decision: 0-based option index and a short reason."""
+
+    index: int
+    reason: str
+
+
+def parse_decision(content: str | None, options_count: int) -> Decision | None:
+    """
+    Parse and validate a structured LLM response.
+
+    Args:
+        content: Raw completion text, expected to contain a JSON object
+        options_count: Number of options the model was asked to choose from
+
+    Returns:
+        Decision if the response names an existing option, None otherwise
+    """
+    if not content:
+        return None
+
+    match = _JSON_OBJECT.search(content)
+    if not match:
+        return None
+
+    try:
+        data: Any = orjson.loads(match.group(0))
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    choice = data.get("choice")
+    if isinstance(choice, str) and choice.strip().isdigit():
+        choice = int(choice)
+    if isinstance(choice, bool) or not isinstance(choice, int):
+        return None
+    if not 1 <= choice <= options_count:
+        return None
+
+    reason = data.get("reason")
+    if not isinstance(reason, str) or not reason.strip():
+        return None
+
+    reason = " ".join(reason.split())[:MAX_REASON_LENGTH]
+    if reason[-1] not in ".!?…":
+        reason += "."
+
+    return Decision(choice - 1, reason)
+
+
+def render_decision(options: list[str], decision: Decision) -> str:
+    """Render a decision into HTML advice using local templates.
+
+    The option comes from the user and the reason from the model, so both
+    are escaped: advice is sent with the bot's default HTML parse mode.
+    """
+    template = random.choice(ADVICE_TEMPLATES)
+    return template.format(
+        option=html.escape(options[decision.index]),
+        reason=html.escape(decision.reason),
+    )
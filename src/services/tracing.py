@@ -0,0 +1,286 @@
+"""Lightweight per-update tracing with spans exported as OTLP-shaped JSONL."""
+
+import json
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any
+
+import structlog
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import TelegramObject, Update
+
+logger = structlog.get_logger()
+
+SERVICE_NAME = "decision-bot"
+
+# OTLP span status codes
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Trace:
+    """All finished spans belonging to one update."""
+
+    __slots__ = ("trace_id", "spans", "error", "log_tokens")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+        self.error = False
+        self.log_tokens: dict[str, Any] = {}
+
+
+class Span:
+    """A single timed operation inside a trace, used as a context manager."""
+
+    __slots__ = (
+        "trace",
+        "name",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+        "_token",
+        "_on_end",
+    )
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        parent_id: str | None,
+        attributes: dict[str, Any],
+        on_end: Callable[["Span"], None] | None = None,
+    ):
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: str | None = None
+        self._token: Any = None
+        self._on_end = on_end
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        if isinstance(exc, Exception):
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.trace.error = True
+
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        self.trace.spans.append(self)
+
+        if self._on_end is not None:
+            self._on_end(self)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        """Span duration in milliseconds."""
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Convert the span to the OTLP/JSON span representation."""
+        span: dict[str, Any] = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+            "status": {"code": STATUS_UNSET},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+class NoopSpan:
+    """Span stand-in returned when no trace is active."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore the attribute."""
+
+
+NOOP_SPAN = NoopSpan()
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """Wrap a Python value into an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Creates spans and exports finished traces with tail-based sampling.
+
+    A trace is started with ``trace`` (once per update) and exported when its
+    root span ends; ``span`` only records children of an active trace.
+    Traces that failed or took longer than ``slow_ms`` are always kept; the
+    rest are kept with probability ``sample_rate``. Until ``configure`` is
+    called nothing is exported, but traces still bind ``trace_id`` into
+    structlog context variables.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an unconfigured tracer."""
+        self.sample_rate = 1.0
+        self.slow_ms = 2000
+        self._export_logger: logging.Logger | None = None
+
+    def configure(
+        self,
+        path: str,
+        sample_rate: float = 0.05,
+        slow_ms: int = 2000,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+    ) -> None:
+        """Export traces to a rotating JSONL file at ``path``."""
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+        export_logger = logging.getLogger("decision_bot.traces")
+        for old_handler in export_logger.handlers:
+            old_handler.close()
+        export_logger.handlers = [handler]
+        export_logger.setLevel(logging.INFO)
+        export_logger.propagate = False
+
+        self._export_logger = export_logger
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+        logger.info(
+            "Tracing enabled", path=path, sample_rate=sample_rate, slow_ms=slow_ms
+        )
+
+    def trace(self, name: str, **attributes: Any) -> Span:
+        """Start a new trace whose root span is named ``name``."""
+        trace = Trace(f"{random.getrandbits(128):032x}")
+        trace.log_tokens = structlog.contextvars.bind_contextvars(
+            trace_id=trace.trace_id
+        )
+        return Span(trace, name, None, attributes, on_end=self._finish)
+
+    def span(self, name: str, **attributes: Any) -> Span | NoopSpan:
+        """Open a child of the current span; a no-op outside of any trace."""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(parent.trace, name, parent.span_id, attributes)
+
+    def _finish(self, root: Span) -> None:
+        """Apply tail-based sampling and export the finished trace."""
+        trace = root.trace
+        structlog.contextvars.reset_contextvars(**trace.log_tokens)
+
+        if self._export_logger is None:
+            return
+
+        keep = (
+            trace.error
+            or root.duration_ms >= self.slow_ms
+            or random.random() < self.sample_rate
+        )
+        if not keep:
+            return
+
+        try:
+            self._export_logger.info(json.dumps(self._to_otlp(trace)))
+        except Exception as e:
+            logger.warning("Could not export trace", error=str(e))
+
+    def _to_otlp(self, trace: Trace) -> dict[str, Any]:
+        """Build an OTLP/JSON ``ExportTraceServiceRequest`` for the trace."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": _otlp_value(SERVICE_NAME),
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [span.to_otlp() for span in trace.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+tracer = Tracer()
+
+
+class UpdateTracingMiddleware(BaseMiddleware):
+    """Dispatcher outer middleware that wraps every update in a span."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """Run the update through the dispatcher inside a ``feed_update`` span."""
+        attributes: dict[str, Any] = {}
+        if isinstance(event, Update):
+            attributes = {"update.id": event.update_id, "update.type": event.event_type}
+
+        with tracer.trace("feed_update", **attributes):
+            return await handler(event, data)
+
+
+class BotApiTracingMiddleware(BaseRequestMiddleware):
+    """Bot session middleware that wraps every Bot API call in a span."""
+
+    async def __call__(self, make_request: Any, bot: Any, method: Any) -> Any:
+        """Perform the API request inside a ``bot.<method>`` span."""
+        api_method = getattr(method, "__api_method__", type(method).__name__)
+        with tracer.span(f"bot.{api_method}"):
+            return await make_request(bot, method)
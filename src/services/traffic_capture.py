@@ -0,0 +1,210 @@
+"""Recording of raw incoming updates for later replay."""
+
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import time
+import zlib
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+import structlog
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+logger = structlog.get_logger()
+
+# Objects (or lists of objects) inside an update that describe a user or chat
+IDENTITY_KEYS = frozenset(
+    {
+        "from",
+        "chat",
+        "user",
+        "sender_chat",
+        "sender_user",
+        "forward_from",
+        "forward_from_chat",
+        "new_chat_members",
+        "left_chat_member",
+        "via_bot",
+    }
+)
+# Personal fields replaced by pseudonyms inside identity objects
+NAME_FIELDS = ("username", "first_name", "last_name", "title")
+# Fields removed from the update entirely
+DROPPED_FIELDS = frozenset({"phone_number", "contact"})
+
+# Write a gzip member every N records or T seconds so a crash loses little
+FLUSH_EVERY = 100
+FLUSH_INTERVAL = 10.0
+
+# Read size used when checking an existing capture for a truncated tail
+CHECK_CHUNK_BYTES = 64 * 1024
+
+
+class TrafficRecorder:
+    """Append raw updates with arrival timestamps to a gzip-compressed JSONL file.
+
+    Each line is ``{"t": <unix time>, "update": <raw update>}``. With
+    ``anonymize`` enabled, user and chat IDs are replaced by keyed hashes
+    (stable within one recorder, so conversations stay linked) and names are
+    replaced by pseudonyms.
+
+    Records are buffered and written in batches, each as a complete gzip
+    member, so the file is readable at any moment and a killed process
+    loses at most the current batch. A member left truncated by a crash
+    mid-write is cut off before new records are appended.
+    """
+
+    def __init__(self, path: str, anonymize: bool = True):
+        """Open the capture file for appending."""
+        self.path = path
+        self.anonymize = anonymize
+        self.recorded = 0
+        self._salt = os.urandom(16)
+        self._pending: list[str] = []
+        self._last_flush = time.monotonic()
+
+        _drop_truncated_tail(path)
+        self._file = open(path, "ab")
+
+        logger.info("Recording traffic", path=path, anonymize=anonymize)
+
+    def record(self, data: dict[str, Any]) -> None:
+        """Append one raw update to the capture."""
+        if self.anonymize:
+            data = self._anonymize(data)
+
+        try:
+            self._pending.append(json.dumps({"t": time.time(), "update": data}))
+            self.recorded += 1
+            if (
+                len(self._pending) >= FLUSH_EVERY
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            ):
+                self.flush()
+        except Exception as e:
+            logger.warning("Could not record update", error=str(e))
+
+    def flush(self) -> None:
+        """Write buffered records to the file as one gzip member."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+
+        lines = "".join(f"{line}\n" for line in self._pending)
+        self._pending.clear()
+        self._file.write(gzip.compress(lines.encode("utf-8")))
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the capture file."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def _anonymize(self, value: Any, identity: bool = False) -> Any:
+        """Return a copy of ``value`` with user identifiers replaced."""
+        if isinstance(value, list):
+            return [self._anonymize(item, identity) for item in value]
+        if not isinstance(value, dict):
+            return value
+
+        result = {}
+        for key, item in value.items():
+            if key in DROPPED_FIELDS:
+                continue
+            if identity and key == "id" and isinstance(item, int):
+                result[key] = self._pseudo_id(item)
+            elif identity and key in NAME_FIELDS and isinstance(item, str):
+                result[key] = f"{key}_{self._digest(item) % 10**6}"
+            else:
+                result[key] = self._anonymize(item, key in IDENTITY_KEYS)
+        return result
+
+    def _pseudo_id(self, value: int) -> int:
+        """Map an ID to a stable pseudonymous ID, keeping its sign."""
+        pseudo = self._digest(value)
+        return -pseudo if value < 0 else pseudo
+
+    def _digest(self, value: int | str) -> int:
+        """Keyed 48-bit hash of a value."""
+        digest = hmac.new(self._salt, str(value).encode(), hashlib.sha256).digest()
+        return int.from_bytes(digest[:6], "big")
+
+
+def _drop_truncated_tail(path: str) -> None:
+    """Cut off a gzip member left incomplete at the end of ``path``."""
+    if not os.path.exists(path):
+        return
+
+    size = os.path.getsize(path)
+    complete = offset = 0
+    member = zlib.decompressobj(wbits=31)
+
+    try:
+        with open(path, "rb") as capture:
+            while chunk := capture.read(CHECK_CHUNK_BYTES):
+                while chunk:
+                    member.decompress(chunk)
+                    if not member.eof:
+                        offset += len(chunk)
+                        break
+                    # Member finished inside this chunk; the rest starts the next
+                    complete = offset + len(chunk) - len(member.unused_data)
+                    chunk = member.unused_data
+                    offset = complete
+                    member = zlib.decompressobj(wbits=31)
+    except zlib.error:
+        pass
+
+    if complete < size:
+        logger.warning(
+            "Dropping truncated capture tail", path=path, bytes=size - complete
+        )
+        with open(path, "r+b") as capture:
+            capture.truncate(complete)
+
+
+def read_capture(path: str) -> Iterator[tuple[float, dict[str, Any]]]:
+    """Yield ``(arrival time, raw update)`` pairs from a capture file.
+
+    Reading stops cleanly at a truncated or corrupt gzip member, so a
+    capture copied while the bot is running, or cut short by a crash, still
+    replays up to that point.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as capture:
+        try:
+            for line in capture:
+                if not line.endswith("\n"):
+                    # Every record ends with a newline; this one was cut off
+                    break
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["t"], record["update"]
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            logger.warning("Capture ends with a truncated record", error=str(e))
+
+
+class UpdateCaptureMiddleware(BaseMiddleware):
+    """Dispatcher outer middleware that records updates received by polling."""
+
+    def __init__(self, recorder: TrafficRecorder):
+        """Initialize the middleware with a recorder."""
+        self.recorder = recorder
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """Record the update, then pass it on."""
+        if isinstance(event, Update):
+            self.recorder.record(
+                event.model_dump(mode="json", exclude_none=True, by_alias=True)
+            )
+        return await handler(event, data)
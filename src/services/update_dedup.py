@@ -0,0 +1,43 @@
+"""Bounded, time-expiring record of processed update IDs."""
+
+import time
+from collections import OrderedDict
+
+
+class SeenUpdates:
+    """Remember recent update_ids so redelivered updates are not reprocessed.
+
+    Telegram redelivers an update when the webhook answers with an error or
+    too slowly. Entries expire after ``ttl`` seconds and the oldest ones are
+    evicted once ``maxsize`` is reached, so memory stays bounded.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 600):
+        """Initialize the seen-set."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._expires: OrderedDict[int, float] = OrderedDict()
+
+    def check_and_add(self, update_id: int) -> bool:
+        """Record ``update_id``; return True if it was already seen."""
+        now = time.monotonic()
+        self._evict_expired(now)
+
+        if update_id in self._expires:
+            return True
+
+        self._expires[update_id] = now + self.ttl
+        if len(self._expires) > self.maxsize:
+            self._expires.popitem(last=False)
+        return False
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop entries whose TTL has passed (oldest first)."""
+        while self._expires:
+            update_id, expires = next(iter(self._expires.items()))
+            if expires > now:
+                break
+            del self._expires[update_id]
+
+    def __len__(self) -> int:
+        return len(self._expires)
@@ -0,0 +1,96 @@
+"""Cheap pre-filtering of raw Telegram updates before pydantic validation."""
+
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+import orjson
+
+# Decoder for webhook bodies; raises ValueError on invalid JSON
+json_loads = orjson.loads
+
+# Message fields checked (in order) to label non-text messages in drop stats
+CONTENT_KINDS = (
+    "sticker",
+    "photo",
+    "animation",
+    "video",
+    "video_note",
+    "voice",
+    "audio",
+    "document",
+    "location",
+    "contact",
+    "poll",
+    "dice",
+)
+
+
+class UpdateFilter:
+    """Decide from the raw payload whether an update is worth materializing.
+
+    Building an ``aiogram.types.Update`` runs full pydantic validation of the
+    whole payload, which is wasted work for updates no handler will ever see.
+    The filter only looks at the top-level keys of the decoded JSON and keeps
+    per-type counters of what was accepted and dropped.
+    """
+
+    def __init__(
+        self,
+        handled_types: Iterable[str] = ("message",),
+        text_types: Iterable[str] = ("message",),
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            handled_types: Update types the router has handlers for
+            text_types: Handled update types that are only relevant with text
+        """
+        self.handled_types = frozenset(handled_types)
+        self.text_types = frozenset(text_types)
+        self.accepted: Counter[str] = Counter()
+        self.dropped: Counter[str] = Counter()
+
+    def accept(self, data: Any) -> bool:
+        """Return True if the update should be fully validated and dispatched."""
+        update_type = self._update_type(data)
+
+        if update_type is None:
+            self.dropped["malformed"] += 1
+            return False
+
+        if update_type not in self.handled_types:
+            self.dropped[update_type] += 1
+            return False
+
+        if update_type in self.text_types:
+            payload = data[update_type]
+            if not isinstance(payload, dict) or not payload.get("text"):
+                self.dropped[f"{update_type}.{self._content_kind(payload)}"] += 1
+                return False
+
+        self.accepted[update_type] += 1
+        return True
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return accepted and dropped counters by update type."""
+        return {"accepted": dict(self.accepted), "dropped": dict(self.dropped)}
+
+    def _update_type(self, data: Any) -> str | None:
+        """Return the update type key, or None if the shape is invalid."""
+        if not isinstance(data, dict) or not isinstance(data.get("update_id"), int):
+            return None
+
+        for key in data:
+            if key != "update_id":
+                return key
+        return None
+
+    def _content_kind(self, payload: Any) -> str:
+        """Label a non-text message by its content type."""
+        if isinstance(payload, dict):
+            for kind in CONTENT_KINDS:
+                if kind in payload:
+                    return kind
+        return "service"
@@ -0,0 +1,26 @@
+"""Shared pytest fixtures."""
+
+from collections.abc import Callable
+
+import pytest
+
+from benchmarks.fakes import FakeDispatcher, FakeMessage, make_config
+from src.config import Config
+
+
+@pytest.fixture
+def config() -> Config:
+    """Config with dummy credentials, fresh for every test."""
+    return make_config()
+
+
+@pytest.fixture
+def make_message() -> Callable[..., FakeMessage]:
+    """Factory for fake incoming messages: ``make_message("Пицца или суши?")``."""
+    return FakeMessage
+
+
+@pytest.fixture
+def dispatcher() -> FakeDispatcher:
+    """Dispatcher stand-in that counts fed updates."""
+    return FakeDispatcher()
@@ -0,0 +1,95 @@
+"""Tests for admission control and readiness degradation."""
+
+from types import SimpleNamespace
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from main import create_app
+from src.handlers.decision_handler import DecisionHandler
+from src.services.admission import AdmissionController
+
+
+def test_admission_sheds_when_llm_calls_saturated():
+    """Test that new work is shed once in-flight LLM calls hit the limit."""
+    admission = AdmissionController(max_llm_calls=1)
+    assert admission.try_admit()
+
+    with admission.llm_call():
+        assert admission.saturation() == ["inflight_llm_calls"]
+        assert not admission.try_admit()
+
+    assert admission.try_admit()
+    assert admission.stats()["shed"] == 1
+
+
+def test_admission_thresholds_are_capacities():
+    """Test that every signal saturates once it reaches its limit."""
+    admission = AdmissionController(max_handlers=1, max_llm_calls=1)
+
+    with admission.handler():
+        assert admission.saturation() == ["inflight_handlers"]
+        with admission.llm_call():
+            assert admission.saturation() == [
+                "inflight_handlers",
+                "inflight_llm_calls",
+            ]
+
+
+def test_admission_uses_loop_lag():
+    """Test that event loop lag past the threshold saturates the process."""
+    monitor = SimpleNamespace(lag_ms=800.0)
+    admission = AdmissionController(max_loop_lag_ms=500, loop_monitor=monitor)
+
+    assert admission.saturation() == ["event_loop_lag"]
+
+
+async def test_single_handler_slot_admits_one_request(config, make_message):
+    """Test that max_handlers=1 still lets one request reach the LLM."""
+    handler = DecisionHandler(config, AdmissionController(max_handlers=1))
+    calls = []
+
+    async def advice(options, *args, **kwargs):
+        calls.append(options)
+        return f"Рекомендую {options[0]}."
+
+    handler.openai_client.get_decision_advice = advice
+    await handler.handle_decision_request(make_message("Пицца или суши?"))
+
+    assert calls == [["Пицца", "суши"]]
+    assert handler.admission.stats()["shed"] == 0
+
+
+async def test_handler_answers_locally_when_saturated(config, make_message):
+    """Test that a shed request gets instant local advice without the LLM."""
+    handler = DecisionHandler(config, AdmissionController(max_llm_calls=0))
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("LLM must not be called while shedding")
+
+    handler.openai_client.get_decision_advice = fail
+    message = make_message("Пицца или суши?")
+
+    await handler.handle_decision_request(message)
+
+    assert message.answers == 1
+    assert message.reactions == 0
+    assert handler.admission.inflight_handlers == 0
+
+
+async def test_health_reports_degraded_when_saturated(config):
+    """Test that /health turns not-ready while the instance is saturated."""
+    admission = AdmissionController(max_llm_calls=1)
+    app = await create_app(config=config, admission=admission)
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get("/health")
+        assert response.status == 200
+        assert (await response.json())["ready"] is True
+
+        with admission.llm_call():
+            response = await client.get("/health")
+            body = await response.json()
+
+        assert response.status == 503
+        assert body["status"] == "degraded"
+        assert body["reasons"] == ["inflight_llm_calls"]
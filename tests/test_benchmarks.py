@@ -0,0 +1,58 @@
+"""Tests for the hot path benchmark suite."""
+
+from benchmarks.bench_hotpaths import (
+    compare,
+    load_baseline,
+    main,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+def test_benchmarks_run():
+    """Test that every hot path benchmark runs and reports metrics."""
+    results = run_benchmarks(iterations=1, repeat=1)
+
+    assert set(results) == {
+        "option_parser.parse_options",
+        "llm_client._build_prompt",
+        "decision_handler.handle_decision_request",
+        "main.webhook_handler",
+    }
+    for result in results.values():
+        assert result["time_per_call_us"] > 0
+        assert result["alloc_peak_bytes"] >= 0
+
+
+def test_benchmark_compare_detects_regressions():
+    """Test that regressions beyond the threshold are reported."""
+    baseline = {"path": {"time_ratio": 1.0, "alloc_peak_bytes": 1000}}
+
+    within = {"path": {"time_ratio": 1.1, "alloc_peak_bytes": 1100}}
+    assert compare(within, baseline, threshold=0.25) == []
+
+    slower = {"path": {"time_ratio": 1.5, "alloc_peak_bytes": 1000}}
+    assert len(compare(slower, baseline, threshold=0.25)) == 1
+
+    heavier = {"path": {"time_ratio": 1.0, "alloc_peak_bytes": 5000}}
+    assert len(compare(heavier, baseline, threshold=0.25)) == 1
+
+
+def test_update_baseline_refuses_unaccepted_regressions(tmp_path):
+    """Test that recording a regression needs --accept-regressions."""
+    path = tmp_path / "baseline.json"
+    fast = {"time_ratio": 1e-9, "time_per_call_us": 0.001, "alloc_peak_bytes": 0}
+    save_baseline(path, {"option_parser.parse_options": fast})
+    args = [
+        "--iterations=1",
+        "--repeat=1",
+        "--only=option_parser.parse_options",
+        f"--baseline={path}",
+        "--update-baseline",
+    ]
+
+    assert main(args) == 1
+    assert load_baseline(path)["option_parser.parse_options"] == fast
+
+    assert main([*args, "--accept-regressions"]) == 0
+    assert load_baseline(path)["option_parser.parse_options"] != fast
@@ -0,0 +1,121 @@
+"""Tests for per-chat conversation memory."""
+
+from src.handlers.decision_handler import DecisionHandler
+from src.services.conversation_memory import CHARS_PER_TOKEN, ConversationMemory
+from src.services.openai_client import API_ERROR_MESSAGE
+
+
+def test_old_turns_fold_into_summary_within_budget():
+    """Test that context keeps recent turns, summarizes older ones and fits."""
+    memory = ConversationMemory(max_turns=2, token_budget=60)
+    memory.add(1, "Пицца или суши?", ["Пицца", "суши"], "Рекомендую суши.")
+    memory.add(1, "Кино или театр?", ["Кино", "театр"], "Выбирай театр.")
+    memory.add(1, "Чай или кофе?", ["Чай", "кофе"], "Мой выбор — кофе.")
+
+    context = memory.context(1)
+    assert context.startswith("Ранее: Пицца / суши → суши")
+    assert context.endswith("Пользователь: Чай или кофе? → Бот: Мой выбор — кофе.")
+    assert len(context) <= 60 * CHARS_PER_TOKEN
+    assert memory.last_options(1) == ("Чай", "кофе")
+    assert memory.context(2) is None
+
+
+def test_clarification_counts_against_the_budget():
+    """Test that a long follow-up message cannot overflow the budget."""
+    memory = ConversationMemory(token_budget=200)
+    memory.add(1, "Пицца или суши?", ["Пицца", "суши"], "Рекомендую суши.")
+
+    context = memory.context(1, clarification="а если " * 500 + "?")
+
+    assert len(context) <= 200 * CHARS_PER_TOKEN
+    assert context.startswith("Пользователь: Пицца или суши?")
+    assert context.splitlines()[-1].startswith("Уточнение: а если")
+
+
+def test_only_recent_short_questions_are_follow_ups():
+    """Test that greetings, long texts and stale chats are not follow-ups."""
+    memory = ConversationMemory(follow_up_window=600)
+    memory.add(1, "Пицца или суши?", ["Пицца", "суши"], "Рекомендую суши.")
+
+    assert memory.follow_up(1, "а если вечером?") == ("Пицца", "суши")
+    assert memory.follow_up(1, "спасибо") is None
+    assert memory.follow_up(1, "а если " * 50 + "?") is None
+    assert memory.follow_up(2, "а если вечером?") is None
+
+    memory.follow_up_window = 0
+    assert memory.follow_up(1, "а если вечером?") is None
+
+
+def test_chats_are_evicted_lru_under_both_caps():
+    """Test that least recently used chats go first and size stays capped."""
+    memory = ConversationMemory(max_chats=2)
+    for chat_id in (1, 2):
+        memory.add(chat_id, "А или Б?", ["А", "Б"], "Рекомендую А.")
+    memory.context(1)
+    memory.add(3, "А или Б?", ["А", "Б"], "Рекомендую А.")
+
+    assert memory.last_options(2) is None
+    assert memory.last_options(1) and memory.last_options(3)
+
+    memory = ConversationMemory(max_bytes=3000)
+    for chat_id in range(100):
+        memory.add(chat_id, "А или Б?" * 20, ["А", "Б"], "Рекомендую А." * 20)
+        assert memory.total_bytes <= 3000
+    assert 0 < len(memory) < 100
+
+
+async def test_follow_up_reuses_options_with_context(config, make_message):
+    """Test that a message without options is answered as a follow-up."""
+    handler = DecisionHandler(config)
+    calls = []
+
+    async def advice(options, context=None, vote_results=None):
+        calls.append((options, context))
+        return f"Рекомендую {options[0]}."
+
+    handler.openai_client.get_decision_advice = advice
+
+    await handler.handle_decision_request(make_message("Пицца или суши?"))
+    follow_up = make_message("а если вечером?")
+    await handler.handle_decision_request(follow_up)
+
+    assert calls[0] == (["Пицца", "суши"], None)
+    options, context = calls[1]
+    assert options == ["Пицца", "суши"]
+    assert "Пользователь: Пицца или суши?" in context
+    assert context.endswith("Уточнение: а если вечером?")
+    assert follow_up.answers == 1
+
+    # New questions are sent without history so they stay cacheable
+    await handler.handle_decision_request(make_message("Кофе или чай?"))
+    assert calls[2] == (["Кофе", "чай"], None)
+
+
+async def test_llm_errors_are_not_remembered(config, make_message):
+    """Test that error texts from the LLM client never reach the memory."""
+    handler = DecisionHandler(config)
+
+    async def failing(options, context=None, vote_results=None):
+        return API_ERROR_MESSAGE
+
+    handler.openai_client.get_decision_advice = failing
+    message = make_message("Пицца или суши?")
+    await handler.handle_decision_request(message)
+
+    assert message.answers == 1
+    assert handler.memory.last_options(message.chat.id) is None
+
+
+async def test_advice_is_remembered_as_plain_text(config, make_message):
+    """Test that HTML escaping of the advice does not leak into the context."""
+    handler = DecisionHandler(config)
+
+    async def advice(options, context=None, vote_results=None):
+        return "Рекомендую Том &amp; Джерри."
+
+    handler.openai_client.get_decision_advice = advice
+    message = make_message("Том & Джерри или Шрек?")
+    await handler.handle_decision_request(message)
+
+    context = handler.memory.context(message.chat.id)
+    assert context.endswith("Бот: Рекомендую Том & Джерри.")
@@ -0,0 +1,74 @@
+"""Tests for the sampling profiler and event loop lag monitor."""
+
+import asyncio
+import threading
+import time
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from main import create_app
+from src.services.diagnostics import LoopLagMonitor, SamplingProfiler
+
+
+def busy_wait(seconds):
+    """Spin on the CPU for a while."""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_sampling_profiler_collects_stacks():
+    """Test that the profiler sees the function a thread is running."""
+    worker = threading.Thread(target=busy_wait, args=(0.5,))
+    worker.start()
+
+    stacks = SamplingProfiler(interval=0.001).sample(worker.ident, 0.2)
+    worker.join()
+
+    assert stacks
+    assert all("busy_wait" in stack for stack in stacks)
+
+
+async def test_loop_lag_monitor_reports_blocked_loop():
+    """Test that blocking the loop is measured and reported as a stall."""
+    monitor = LoopLagMonitor(interval=0.01, threshold_ms=50)
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    time.sleep(0.3)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert monitor.stalls >= 1
+    assert monitor.max_lag_ms >= 200
+
+
+async def test_profile_route_requires_admin_token(config):
+    """Test that the profile route is authenticated and returns stacks."""
+    config.admin_token = "s3cret-admin-token"
+    app = await create_app(config=config)
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.get("/admin/profile?seconds=0.1")
+        assert response.status == 401
+
+        response = await client.get(
+            "/admin/profile?seconds=0.1",
+            headers={"Authorization": "Bearer s3cret-admin-token"},
+        )
+        assert response.status == 200
+        assert "(" in await response.text()
+
+        response = await client.get("/metrics")
+        assert "event_loop" in await response.json()
+
+
+async def test_profiler_runs_one_session_at_a_time():
+    """Test that a concurrent profiling request is refused, not queued."""
+    profiler = SamplingProfiler(interval=0.001)
+
+    first, second = await asyncio.gather(profiler.profile(0.1), profiler.profile(0.1))
+
+    assert first is not None
+    assert second is None
+    assert not profiler.running
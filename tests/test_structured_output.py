@@ -0,0 +1,86 @@
+"""Tests for structured LLM decisions."""
+
+from types import SimpleNamespace
+
+from src.services.openai_client import LLMClient
+from src.services.structured_output import Decision, parse_decision, render_decision
+
+
+class ScriptedCompletions:
+    """Fake completions API returning canned contents in order."""
+
+    def __init__(self, *contents):
+        self.contents = list(contents)
+        self.calls = []
+
+    async def create(self, **params):
+        self.calls.append(params)
+        content = self.contents.pop(0)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=None,
+        )
+
+
+def make_client(config, *contents):
+    """Create an LLMClient backed by scripted completions."""
+    client = LLMClient(config)
+    completions = ScriptedCompletions(*contents)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def test_parse_decision_validates_against_options():
+    """Test that only well-formed decisions naming a real option pass."""
+    assert parse_decision('{"choice": 2, "reason": "Полезнее"}', 2) == Decision(
+        1, "Полезнее."
+    )
+    assert parse_decision('```json\n{"choice": "1", "reason": "Быстрее!"}\n```', 2) == (
+        Decision(0, "Быстрее!")
+    )
+    assert parse_decision('{"choice": 3, "reason": "Нет такого"}', 2) is None
+    assert parse_decision('{"choice": 1, "reason": ""}', 2) is None
+    assert parse_decision("Рекомендую суши.", 2) is None
+    assert parse_decision(None, 2) is None
+
+
+def test_render_decision_uses_option_text():
+    """Test that advice is rendered from the chosen option locally."""
+    advice = render_decision(["Пицца", "суши"], Decision(1, "Полезнее."))
+
+    assert "суши" in advice
+    assert advice.endswith("Полезнее.")
+
+
+def test_render_decision_escapes_html():
+    """Test that option and reason text cannot break the HTML parse mode."""
+    advice = render_decision(["R&D", "маркетинг"], Decision(0, "Меньше <рисков>."))
+
+    assert "R&amp;D" in advice
+    assert advice.endswith("Меньше &lt;рисков&gt;.")
+
+
+async def test_structured_advice_retries_invalid_response_and_caches(config):
+    """Test that an invalid response is retried and the result cached."""
+    client, completions = make_client(
+        config,
+        '{"choice": 5, "reason": "Вне списка"}',
+        '{"choice": 1, "reason": "Тёплый и уютный вечер"}',
+    )
+
+    advice = await client.get_decision_advice(["Кино", "театр"])
+    assert "Кино" in advice
+    assert len(completions.calls) == 2
+    assert completions.calls[0]["max_tokens"] < 150
+
+    # Same options again are answered from the cache by option index
+    assert "кино" in await client.get_decision_advice(["кино", "Театр"])
+    assert len(completions.calls) == 2
+
+
+async def test_structured_advice_gives_up_after_retries(config):
+    """Test that None is returned so the handler can fall back."""
+    client, completions = make_client(config, "Рекомендую кино.", "Рекомендую театр.")
+
+    assert await client.get_decision_advice(["Кино", "театр"]) is None
+    assert len(completions.calls) == 2
@@ -0,0 +1,107 @@
+"""Tests for superseding stale requests and inline mode."""
+
+import asyncio
+from types import SimpleNamespace
+
+from src.handlers.decision_handler import DecisionHandler
+
+
+class FakeInlineQuery:
+    """Minimal stand-in for ``aiogram.types.InlineQuery``."""
+
+    def __init__(self, query, user_id=424242):
+        self.query = query
+        self.from_user = SimpleNamespace(id=user_id)
+        self.results = None
+
+    async def answer(self, results, **kwargs):
+        self.results = results
+
+
+async def test_newer_message_supersedes_inflight_llm_call(config, make_message):
+    """Test that only the latest message from a user gets an answer."""
+    handler = DecisionHandler(config)
+    calls = []
+
+    async def slow_advice(options, *args, **kwargs):
+        calls.append(options)
+        await asyncio.sleep(0.2 if len(calls) == 1 else 0)
+        return f"Рекомендую {options[0]}."
+
+    handler.openai_client.get_decision_advice = slow_advice
+    first = make_message("Пицца или суши?")
+    second = make_message("Пицца или роллы?")
+
+    first_task = asyncio.create_task(handler.handle_decision_request(first))
+    await asyncio.sleep(0.05)
+    await handler.handle_decision_request(second)
+    await first_task
+
+    assert len(calls) == 2
+    assert first.answers == 0
+    assert second.answers == 1
+    assert handler._inflight == {}
+    assert not first_task.cancelled()
+
+
+async def test_outside_cancellation_is_not_swallowed(config, make_message):
+    """Test that cancelling a handler task from elsewhere still cancels it."""
+    handler = DecisionHandler(config)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    handler.openai_client.get_decision_advice = hang
+    message = make_message("Пицца или суши?")
+
+    task = asyncio.create_task(handler.handle_decision_request(message))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert task.cancelled()
+    assert message.answers == 0
+    assert handler._inflight == {}
+
+
+async def test_inline_query_debounces_and_uses_cache(config):
+    """Test that stale keystrokes are dropped and cached advice is reused."""
+    config.inline_debounce_ms = 50
+    handler = DecisionHandler(config)
+    handler.openai_client.cache.put(["Пицца", "суши"], "Рекомендую суши.")
+
+    stale = FakeInlineQuery("Пицца или су")
+    latest = FakeInlineQuery("Пицца или суши")
+    await asyncio.gather(
+        handler.handle_inline_query(stale), handler.handle_inline_query(latest)
+    )
+
+    assert stale.results is None
+    (result,) = latest.results
+    assert result.title == "🎯 Рекомендую суши."
+
+
+async def test_inline_query_falls_back_to_local_engine(config):
+    """Test that uncached options are answered without calling the LLM."""
+    config.inline_debounce_ms = 0
+    handler = DecisionHandler(config)
+
+    query = FakeInlineQuery("Кофе или чай")
+    await handler.handle_inline_query(query)
+
+    (result,) = query.results
+    assert "Кофе" in result.title or "чай" in result.title
+
+
+async def test_inline_answer_escapes_html(config):
+    """Test that the query cannot break the HTML parse mode of the message."""
+    config.inline_debounce_ms = 0
+    handler = DecisionHandler(config)
+
+    query = FakeInlineQuery("R&D или <маркетинг>")
+    await handler.handle_inline_query(query)
+
+    (result,) = query.results
+    text = result.input_message_content.message_text
+    assert text.startswith("R&amp;D или &lt;маркетинг&gt;\n\n🎯 ")
+    assert "&amp;" not in result.title
@@ -0,0 +1,71 @@
+"""Tests for per-update tracing."""
+
+import json
+
+import pytest
+import structlog
+
+from src.services.tracing import Tracer
+
+
+def read_traces(path):
+    """Read exported traces from a JSONL file."""
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_tracer_exports_failed_traces(tmp_path):
+    """Test that failed traces are kept and exported in OTLP shape."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer()
+    tracer.configure(str(path), sample_rate=0.0, slow_ms=60_000)
+
+    with tracer.trace("feed_update", **{"update.id": 7}):
+        trace_id = structlog.contextvars.get_contextvars()["trace_id"]
+        with tracer.span("handler.parse"):
+            pass
+        with pytest.raises(RuntimeError):
+            with tracer.span("llm.chat.completions.create"):
+                raise RuntimeError("boom")
+
+    assert "trace_id" not in structlog.contextvars.get_contextvars()
+
+    (trace,) = read_traces(path)
+    spans = trace["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {span["name"]: span for span in spans}
+
+    assert {span["traceId"] for span in spans} == {trace_id}
+    root = by_name["feed_update"]
+    assert "parentSpanId" not in root
+    assert root["attributes"] == [{"key": "update.id", "value": {"intValue": "7"}}]
+    assert by_name["handler.parse"]["parentSpanId"] == root["spanId"]
+    assert by_name["llm.chat.completions.create"]["status"]["code"] == 2
+
+
+def test_tracer_samples_fast_successful_traces(tmp_path):
+    """Test that fast successful traces are dropped unless sampled or slow."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer()
+    tracer.configure(str(path), sample_rate=0.0, slow_ms=60_000)
+
+    with tracer.trace("feed_update"):
+        pass
+    assert read_traces(path) == []
+
+    tracer.slow_ms = 0
+    with tracer.trace("feed_update"):
+        pass
+    assert len(read_traces(path)) == 1
+
+
+def test_tracer_span_outside_trace_is_noop(tmp_path):
+    """Test that spans opened outside of a trace are not recorded."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer()
+    tracer.configure(str(path), sample_rate=1.0)
+
+    with tracer.span("handler.parse") as span:
+        span.set_attribute("options.count", 2)
+
+    assert read_traces(path) == []
@@ -0,0 +1,108 @@
+"""Tests for traffic capture and replay."""
+
+import gzip
+
+from benchmarks.corpus import sticker_update, text_update
+from benchmarks.replay import LatencyProfile, replay
+from src.services import traffic_capture
+from src.services.traffic_capture import TrafficRecorder, read_capture
+
+
+def test_recorder_anonymizes_user_identifiers(tmp_path):
+    """Test that captured updates keep their shape but not user identity."""
+    path = tmp_path / "capture.jsonl.gz"
+    recorder = TrafficRecorder(str(path), anonymize=True)
+    recorder.record(text_update(1, "Пицца или суши?"))
+    recorder.record(text_update(2, "Кофе или чай?"))
+    recorder.close()
+
+    (t1, first), (t2, second) = read_capture(str(path))
+    message = first["message"]
+
+    assert t1 <= t2
+    assert message["text"] == "Пицца или суши?"
+    assert message["from"]["id"] != 424242
+    assert message["from"]["username"] != "ivan_decides"
+    assert message["from"]["id"] == message["chat"]["id"]
+    assert second["message"]["from"]["id"] == message["from"]["id"]
+
+
+def test_recorder_anonymizes_nested_and_listed_users(tmp_path):
+    """Test that members, forward origins and inline bots are anonymized."""
+    path = tmp_path / "capture.jsonl.gz"
+    update = text_update(1, "Пицца или суши?")
+    update["message"].update(
+        {
+            "new_chat_members": [{"id": 777, "is_bot": False, "username": "anna"}],
+            "left_chat_member": {"id": 888, "is_bot": False, "first_name": "Oleg"},
+            "forward_origin": {
+                "type": "user",
+                "date": 0,
+                "sender_user": {"id": 999, "is_bot": False, "first_name": "Ira"},
+            },
+            "via_bot": {"id": 555, "is_bot": True, "username": "some_bot"},
+        }
+    )
+
+    recorder = TrafficRecorder(str(path), anonymize=True)
+    recorder.record(update)
+    recorder.close()
+
+    ((_, captured),) = read_capture(str(path))
+    message = captured["message"]
+    origin = message["forward_origin"]["sender_user"]
+
+    assert message["new_chat_members"][0]["id"] != 777
+    assert message["new_chat_members"][0]["username"] != "anna"
+    assert message["left_chat_member"]["id"] != 888
+    assert message["left_chat_member"]["first_name"] != "Oleg"
+    assert origin["id"] != 999
+    assert origin["first_name"] != "Ira"
+    assert message["via_bot"]["id"] != 555
+    assert message["via_bot"]["is_bot"] is True
+
+
+def test_capture_survives_kill_and_restart(tmp_path, monkeypatch):
+    """Test that a truncated capture reads cleanly and can be appended to."""
+    monkeypatch.setattr(traffic_capture, "FLUSH_EVERY", 2)
+    path = tmp_path / "capture.jsonl.gz"
+
+    recorder = TrafficRecorder(str(path), anonymize=False)
+    for update_id in range(1, 4):
+        recorder.record(text_update(update_id, "Пицца или суши?"))
+
+    # Killed without close(): the flushed batch is readable, the rest is lost
+    snapshot = [data["update_id"] for _, data in read_capture(str(path))]
+    assert snapshot == [1, 2]
+
+    # A write cut short mid-member, then a restart appending new records
+    with path.open("ab") as capture:
+        capture.write(gzip.compress(b'{"t": 0, "update": {}}\n')[:-10])
+    assert [data["update_id"] for _, data in read_capture(str(path))] == [1, 2]
+
+    recorder = TrafficRecorder(str(path), anonymize=False)
+    recorder.record(text_update(4, "Кофе или чай?"))
+    recorder.close()
+
+    assert [data["update_id"] for _, data in read_capture(str(path))] == [1, 2, 4]
+
+
+async def test_replay_feeds_capture_through_dispatcher():
+    """Test that a capture replays against stubbed Bot and LLM backends."""
+    records = [
+        (0.0, text_update(1, "Пицца или суши?")),
+        (0.5, sticker_update(2)),
+        (1.0, text_update(3, "/start")),
+    ]
+
+    report = await replay(
+        records,
+        speed=None,
+        llm_profile=LatencyProfile([0]),
+        bot_profile=LatencyProfile([0]),
+    )
+
+    assert report["updates"] == 3
+    assert report["errors"] == 0
+    assert report["llm_calls"] == 1
+    assert report["bot_api_calls"] >= 2
@@ -0,0 +1,31 @@
+"""Tests for webhook update pre-filtering."""
+
+from benchmarks.corpus import edited_update, photo_update, sticker_update, text_update
+from src.services.update_filter import UpdateFilter
+
+
+def test_update_filter_accepts_text_messages():
+    """Test that text messages pass the filter."""
+    update_filter = UpdateFilter()
+
+    assert update_filter.accept(text_update(1, "Пицца или суши?"))
+    assert update_filter.stats()["accepted"] == {"message": 1}
+
+
+def test_update_filter_drops_ignored_updates():
+    """Test that updates the router ignores are dropped and counted."""
+    update_filter = UpdateFilter()
+
+    assert not update_filter.accept(sticker_update(1))
+    assert not update_filter.accept(photo_update(2))
+    assert not update_filter.accept(edited_update(3, "Кофе или чай?"))
+    assert not update_filter.accept({"update_id": 4, "message": {"chat": {}}})
+    assert not update_filter.accept([1, 2, 3])
+
+    assert update_filter.stats()["dropped"] == {
+        "message.sticker": 1,
+        "message.photo": 1,
+        "edited_message": 1,
+        "message.service": 1,
+        "malformed": 1,
+    }
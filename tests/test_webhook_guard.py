@@ -0,0 +1,61 @@
+"""Tests for webhook secret verification and update deduplication."""
+
+import json
+from types import SimpleNamespace
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from benchmarks.corpus import text_update
+from main import SECRET_TOKEN_HEADER, create_app, ensure_webhook_secret
+from src.config import Config
+from src.services.update_dedup import SeenUpdates
+
+
+def test_seen_updates_expire_and_stay_bounded():
+    """Test that the seen-set forgets expired and oldest update_ids."""
+    seen = SeenUpdates(maxsize=2, ttl=600)
+    assert not seen.check_and_add(1)
+    assert seen.check_and_add(1)
+
+    seen.check_and_add(2)
+    seen.check_and_add(3)
+    assert len(seen) == 2
+    assert not seen.check_and_add(1)
+
+    expired = SeenUpdates(ttl=0)
+    expired.check_and_add(1)
+    assert not expired.check_and_add(1)
+
+
+async def test_webhook_rejects_bad_secret_and_skips_duplicates(config, dispatcher):
+    """Test that only authenticated, first deliveries reach the dispatcher."""
+    config.webhook_secret = "telegram-secret_1"
+    app = await create_app(SimpleNamespace(id=0), dispatcher, config)
+    body = json.dumps(text_update(100, "Пицца или суши?"))
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post(config.webhook_path, data=body)
+        assert response.status == 401
+
+        headers = {SECRET_TOKEN_HEADER: config.webhook_secret}
+        for _ in range(2):
+            response = await client.post(
+                config.webhook_path, data=body, headers=headers
+            )
+            assert response.status == 200
+
+        metrics = await (await client.get("/metrics")).json()
+
+    assert dispatcher.fed == 1
+    assert metrics["webhook"] == {"rejected": 1, "duplicates": 1}
+
+
+def test_webhook_secret_is_generated_when_unset(config):
+    """Test that webhook verification does not depend on configuring a secret."""
+    assert config.webhook_secret is None
+
+    secret = ensure_webhook_secret(config)
+    assert len(secret) >= 32
+    assert config.webhook_secret == secret
+    assert ensure_webhook_secret(config) == secret
+    assert Config.validate_webhook_secret(secret) == secret